@@ -1,12 +1,12 @@
 import os
 import sys
-import time
 
 # Add current directory to path so we can import modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from supabase import create_client
 from modules.visuals import VisualGenerator
+from modules.backfill import BackfillEngine
 import config
 
 def backfill_images():
@@ -14,7 +14,7 @@ def backfill_images():
     print("-" * 50)
 
     # 1. Conectar ao Supabase
-    supabase = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+    supabase = create_client(*config.supabase_credentials())
     visuals = VisualGenerator()
 
     # 2. Buscar posts sem imagem ou com placeholder
@@ -36,27 +36,9 @@ def backfill_images():
 
     print(f"   Encontrados {len(posts_to_update)} posts precisando de imagem.\n")
 
-    # 3. Gerar e atualizar cada post
-    success_count = 0
-    for i, post in enumerate(posts_to_update, 1):
-        print(f"[{i}/{len(posts_to_update)}] Processando: {post['title'][:50]}...")
-        
-        try:
-            image_url = visuals.generate_and_upload_image(post['title'], post['slug'])
-            
-            if image_url:
-                # Atualiza no banco
-                supabase.table("posts").update({"image_url": image_url}).eq("id", post['id']).execute()
-                print(f"   ✅ Imagem salva e post atualizado!")
-                success_count += 1
-            else:
-                print(f"   ⚠️ Falha na geração (veja logs acima)")
-            
-            # Delay para não estourar rate limit
-            time.sleep(2)
-            
-        except Exception as e:
-            print(f"   ❌ Erro: {e}")
+    # 3. Gerar e atualizar os posts em paralelo (respeitando o limite do Gemini)
+    engine = BackfillEngine(supabase, visuals)
+    success_count, _ = engine.run(posts_to_update)
 
     print(f"\n🏁 Backfill finalizado! {success_count}/{len(posts_to_update)} imagens geradas.")
 
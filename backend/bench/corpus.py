@@ -0,0 +1,155 @@
+import json
+import random
+from email.utils import formatdate
+
+# Vocabulary mixing plain words with the tagger keywords, so every tag fires sometimes
+WORDS = [
+    "release", "update", "guide", "performance", "launch", "tutorial", "deep", "dive", "new", "feature",
+    "nuxt", "vue", "pinia", "vite", "composition api", "ai", "llm", "gpt", "agent", "copilot", "gemini",
+    "n8n", "automation", "zapier", "workflow", "python", "docker", "node.js", "rust", "go", "java",
+    "php", "laravel", "database", "api", "vibe", "setup", "music", "open", "source", "security",
+    "cloud", "kubernetes", "frontend", "backend", "testing", "typescript", "react", "data", "server",
+]
+
+CITIES = ["guadalajara", "bogota", "cdmx", "medellin", "lima", "santiago", "buenos-aires", "sao-paulo", "remote"]
+COUNTRIES = ["", "---mx", "---co", "---br", "---ar", "--pe"]
+ROLES = ["senior", "python", "developer", "react", "engineer", "data", "devops", "full", "stack", "node", "qa", "lead"]
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def titles(n, seed=1):
+    rng = random.Random(seed)
+    return [_sentence(rng, rng.randint(4, 10)) for _ in range(n)]
+
+
+def summaries(n, seed=2):
+    rng = random.Random(seed)
+    return [f"<p>{_sentence(rng, rng.randint(30, 80))}.</p>" for _ in range(n)]
+
+
+def urls(n, seed=3):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        url = f"https://{rng.choice(['dev.to', 'blog.example.com', 'news.example.org'])}/posts/{i}-{rng.choice(WORDS).replace(' ', '-')}"
+        if rng.random() < 0.5:
+            url += f"?utm_source=rss&utm_medium={rng.choice(['feed', 'social'])}&ref={i}"
+        if rng.random() < 0.3:
+            url += "/"
+        out.append(url)
+    return out
+
+
+def rss(feed_id, entries, seed):
+    """RSS 2.0 document with `entries` items (media thumbnails on a third of them)."""
+    rng = random.Random(seed)
+    items = []
+    for i, (title, summary) in enumerate(zip(titles(entries, seed), summaries(entries, seed + 1))):
+        media = f'<media:thumbnail url="https://img.example.com/{feed_id}/{i}.jpg"/>' if i % 3 == 0 else ""
+        items.append(
+            f"<item><title>{title}</title><link>https://feed{feed_id}.example.com/p/{i}?utm_source=rss</link>"
+            f"<description><![CDATA[{summary}]]></description><guid>feed{feed_id}-{i}</guid>"
+            f"<pubDate>{formatdate(1_700_000_000 - i * 3600 - rng.randint(0, 600))}</pubDate>{media}</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        f"<title>Feed {feed_id}</title>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def atom(feed_id, entries, seed):
+    """Atom document with `entries` entries."""
+    entries_xml = []
+    for i, (title, summary) in enumerate(zip(titles(entries, seed), summaries(entries, seed + 1))):
+        entries_xml.append(
+            f"<entry><title>{title}</title><link rel=\"alternate\" href=\"https://feed{feed_id}.example.com/e/{i}\"/>"
+            f"<id>tag:feed{feed_id},{i}</id><published>2023-11-14T{i % 24:02d}:00:00Z</published>"
+            f"<summary type=\"html\"><![CDATA[{summary}]]></summary></entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>Feed {feed_id}</title>{''.join(entries_xml)}</feed>"
+    ).encode("utf-8")
+
+
+def feeds(count, entries, seed=4):
+    """
+    Returns (sources, bodies): Scraper-style source dicts and {url: bytes}.
+    Half the feeds are RSS read with the fast parser, the rest Atom through feedparser.
+    """
+    sources = []
+    bodies = {}
+    for i in range(count):
+        url = f"https://feed{i}.example.com/{'rss' if i % 2 == 0 else 'atom'}.xml"
+        source = {"name": f"Feed {i}", "url": url, "type": "news"}
+        if i % 2 == 0:
+            source["parser"] = "fast"
+            bodies[url] = rss(i, entries, seed + i)
+        else:
+            bodies[url] = atom(i, entries, seed + i)
+        sources.append(source)
+    return sources, bodies
+
+
+def howdy_slugs(n, seed=5):
+    rng = random.Random(seed)
+    slugs = []
+    for _ in range(n):
+        role = "-".join(rng.choice(ROLES) for _ in range(rng.randint(2, 5)))
+        location = f"-{rng.choice(CITIES)}{rng.choice(COUNTRIES)}" if rng.random() < 0.7 else ""
+        salesforce_id = f"-a1Z{''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(15))}"
+        slugs.append(role + location + salesforce_id)
+    return slugs
+
+
+def articles(n, seed=6):
+    """Generated-article dicts like the ContentGenerator returns (with image_url attached)."""
+    rng = random.Random(seed)
+    out = []
+    for i, title in enumerate(titles(n, seed)):
+        out.append({
+            "title": title,
+            "slug": f"{title.lower().replace(' ', '-')[:60]}-{i}",
+            "content": "\n\n".join(f"## {_sentence(rng, 4)}\n\n{_sentence(rng, 60)}." for _ in range(6)),
+            "excerpt": _sentence(rng, 25),
+            "image_url": f"https://cdn.example.com/{i}.webp",
+            "tags": rng.sample(["Vue&Nuxt", "IA Dev", "Automações", "Backend", "Vibe Coding"], 2),
+            "type": "news",
+            "original_url": f"https://news.example.org/{i}",
+        })
+    return out
+
+
+def completions(n, seed=7):
+    """Raw completions as the model returns them: mostly valid JSON, some fenced or broken."""
+    rng = random.Random(seed)
+    out = []
+    for article in articles(n, seed):
+        raw = json.dumps({k: article[k] for k in ("title", "slug", "excerpt", "content", "tags", "type")},
+                         ensure_ascii=False, indent=2)
+        roll = rng.random()
+        if roll < 0.15:
+            raw = f"```json\n{raw}\n```"
+        elif roll < 0.25:
+            raw = raw.replace('"type": "news"', '"type": "news",')  # trailing comma
+        elif roll < 0.30:
+            raw = raw[:-2]  # truncated
+        out.append(raw)
+    return out
+
+
+def videos(n, seed=8):
+    rng = random.Random(seed)
+    return [{
+        "title": title,
+        "thumbnail": f"https://i.ytimg.com/vi/{i}/hqdefault.jpg",
+        "url": f"https://www.youtube.com/watch?v={i:011d}",
+        "author": rng.choice(["Fireship", "Rocketseat", "Nuxt"]),
+        "duration": "",
+        "published_at": "2023-11-14T10:00:00+00:00",
+        "tags": ["IA Dev"],
+    } for i, title in enumerate(titles(n, seed))]
@@ -2,7 +2,7 @@
 from supabase import create_client
 import config
 
-sb = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+sb = create_client(*config.supabase_credentials())
 r = sb.table("posts").select("id, title, slug, image_url").like("image_url", "%placehold%").execute()
 
 print(f"\nArtigos com placeholder: {len(r.data)}")
@@ -12,7 +12,60 @@ SUPABASE_URL = get_env("SUPABASE_URL")
 SUPABASE_KEY = get_env("SUPABASE_KEY")
 NANO_BANANA_KEY = get_env("NANO_BANANA_KEY") # Chave do Gemini/Nano Banana
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError(
-        "❌ Erro de Configuração: SUPABASE_URL ou SUPABASE_KEY não encontrados no arquvio .env."
-    )
+# Artigos publicados por execução (>1 ativa o modo lote do ContentGenerator)
+ARTICLES_PER_RUN = int(get_env("ARTICLES_PER_RUN") or 1)
+# Chamadas simultâneas à OpenAI no modo lote
+WRITER_CONCURRENCY = int(get_env("WRITER_CONCURRENCY") or 4)
+
+# Cache local das respostas da OpenAI (reexecuções não pagam a mesma chamada de novo)
+LLM_CACHE_TTL_HOURS = float(get_env("LLM_CACHE_TTL_HOURS") or 168)
+LLM_CACHE_MAX_ENTRIES = int(get_env("LLM_CACHE_MAX_ENTRIES") or 500)
+LLM_CACHE_BYPASS = (get_env("LLM_CACHE_BYPASS") or "").lower() in ("1", "true", "yes")
+
+# Backfill de imagens: limite de requisições/minuto do Gemini e workers paralelos
+GEMINI_RPM = float(get_env("GEMINI_RPM") or 10)
+BACKFILL_WORKERS = int(get_env("BACKFILL_WORKERS") or 4)
+
+# Qualidade das variantes WebP/AVIF das imagens: high, balanced ou small
+IMAGE_QUALITY = get_env("IMAGE_QUALITY") or "balanced"
+
+# Taxa de falso positivo do filtro de Bloom do índice de URLs (acertos são confirmados no SQLite)
+DEDUP_BLOOM_ERROR_RATE = float(get_env("DEDUP_BLOOM_ERROR_RATE") or 0.001)
+
+# Fontes que falham SOURCE_MAX_FAILURES execuções seguidas ficam pausadas por SOURCE_DISABLE_HOURS (depois, uma nova tentativa)
+SOURCE_MAX_FAILURES = int(get_env("SOURCE_MAX_FAILURES") or 5)
+SOURCE_DISABLE_HOURS = float(get_env("SOURCE_DISABLE_HOURS") or 24)
+# Diretório opcional lido pelo textfile collector do node_exporter (métricas Prometheus)
+METRICS_TEXTFILE_DIR = get_env("METRICS_TEXTFILE_DIR")
+
+# Agenda dos feeds: limites do intervalo aprendido por feed e feeds buscados por execução (0 = todos os devidos)
+SCHEDULER_MIN_MINUTES = float(get_env("SCHEDULER_MIN_MINUTES") or 15)
+SCHEDULER_MAX_HOURS = float(get_env("SCHEDULER_MAX_HOURS") or 24 * 7)
+SCHEDULER_MAX_PER_RUN = int(get_env("SCHEDULER_MAX_PER_RUN") or 0)
+
+# Modo daemon (main.py --daemon): intervalo de cada pipeline e porta do health check (0 desativa)
+DAEMON_ARTICLES_MINUTES = float(get_env("DAEMON_ARTICLES_MINUTES") or 240)
+DAEMON_JOBS_MINUTES = float(get_env("DAEMON_JOBS_MINUTES") or 60)
+DAEMON_VIDEOS_MINUTES = float(get_env("DAEMON_VIDEOS_MINUTES") or 120)
+HEALTH_PORT = int(get_env("HEALTH_PORT") or 8080)
+
+# Modo paralelo (main.py --parallel): tempo limite de cada pipeline e prazo da execução inteira
+ARTICLES_TIMEOUT_MINUTES = float(get_env("ARTICLES_TIMEOUT_MINUTES") or 20)
+JOBS_TIMEOUT_MINUTES = float(get_env("JOBS_TIMEOUT_MINUTES") or 5)
+VIDEOS_TIMEOUT_MINUTES = float(get_env("VIDEOS_TIMEOUT_MINUTES") or 5)
+RUN_DEADLINE_MINUTES = float(get_env("RUN_DEADLINE_MINUTES") or 25)
+
+# Destino dos spans de trace: "console" (árvore ao fim de cada pipeline), "jsonl" (traces.jsonl), ambos ou "off"
+TRACING = (get_env("TRACING") or "console,jsonl").lower()
+
+
+def supabase_credentials():
+    """
+    Returns (url, key) for create_client(). Checked only when a real client is
+    created, so offline runs (main.py --replay, benchmarks) need no credentials.
+    """
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError(
+            "❌ Erro de Configuração: SUPABASE_URL ou SUPABASE_KEY não encontrados no arquvio .env."
+        )
+    return SUPABASE_URL, SUPABASE_KEY
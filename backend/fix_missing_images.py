@@ -9,10 +9,10 @@ Uso: python backend/fix_missing_images.py
 """
 
 import sys
-import time
 from supabase import create_client
 import config
 from modules.visuals import VisualGenerator
+from modules.backfill import BackfillEngine
 
 PLACEHOLDER = "https://placehold.co/1200x630?text=TechHub"
 
@@ -37,39 +37,16 @@ def find_posts_without_image(supabase):
 
 
 def fix_images(supabase, posts, visuals):
-    """Gera e faz upload de imagem para cada post sem imagem."""
-    success = 0
-    failed = 0
-
-    for i, post in enumerate(posts, 1):
-        print(f"\n{'='*60}")
-        print(f"[{i}/{len(posts)}] 📝 {post['title']}")
-        print(f"   Slug: {post['slug']}")
-        print(f"   Imagem atual: {post.get('image_url', 'NENHUMA')}")
-
-        image_url = visuals.generate_and_upload_image(post["title"], post["slug"])
-
-        if image_url:
-            supabase.table("posts").update({"image_url": image_url}).eq("id", post["id"]).execute()
-            print(f"   ✅ Atualizado no banco: {image_url}")
-            success += 1
-        else:
-            print(f"   ❌ Falha ao gerar imagem para: {post['title']}")
-            failed += 1
-
-        # Pequeno delay para não sobrecarregar a API
-        if i < len(posts):
-            print("   ⏳ Aguardando 3s antes do próximo...")
-            time.sleep(3)
-
-    return success, failed
+    """Gera e faz upload de imagem para cada post sem imagem (em paralelo, com rate limit)."""
+    engine = BackfillEngine(supabase, visuals)
+    return engine.run(posts)
 
 
 def main():
     print("🚀 Fix Missing Images - TechHub")
     print("=" * 60)
 
-    supabase = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+    supabase = create_client(*config.supabase_credentials())
     visuals = VisualGenerator()
 
     if not visuals.client:
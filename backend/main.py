@@ -1,141 +1,544 @@
 from supabase import create_client
 import config
-import random
 from modules.scraper import Scraper
 from modules.writer import ContentGenerator
 from modules.visuals import VisualGenerator
 from modules.jobs_scraper import JobScraper
 from modules.video_scraper import VideoScraper
-import datetime
+from modules.dedup_index import DedupIndex
+from modules.clustering import StoryClusterer
+from modules.persistence import BulkWriter, post_row, video_row
+from modules.work_queue import WorkQueue, STAGES
+from modules.ranking import CandidateRanker
+from modules.replay import FixtureArchive
+from modules.http_client import default_client
+from modules.tracing import span
+from modules import storage, tracing
+from modules.daemon import PipelineDaemon
+from modules.orchestrator import run_concurrently, print_summary
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+import argparse
+import json
+import tempfile
+import threading
+import time
 
-def run_article_pipeline(supabase):
-    print("\n📰 INICIANDO AUTOMAÇÃO DE ARTIGOS...")
-    try:
-        # Fetch existing URLs to prevent duplicates (PRE-GENERATION CHECK)
-        existing_posts = supabase.table("posts").select("original_url").execute()
-        existing_urls = [row['original_url'] for row in existing_posts.data if row['original_url']] if existing_posts.data else []
-        print(f"   ℹ️ {len(existing_urls)} artigos já cadastrados no histórico.")
+class EarlyStart:
+    """
+    Reacts to the streamed article header (title/slug/tags): drops slugs that
+    already exist (local slug index, no query) before the long `content` is
+    paid for, and starts the cover
+    image (import of the source image or Nano Banana) while the text is still
+    being generated.
+    """
 
-        scraper = Scraper()
-        articles_found = scraper.get_latest_news(limit=2, existing_urls=existing_urls)
-        
-        if not articles_found:
-            print("📭 Nenhum artigo NOVO encontrado.")
+    def __init__(self, slugs, visuals):
+        self.slugs = slugs
+        self.visuals = visuals
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.images = {}
+        # Links whose generation was cancelled because the slug exists
+        self.duplicates = set()
+
+    def __call__(self, target_news, header):
+        slug = header.get('slug')
+        if not slug:
+            return True
+
+        if slug in self.slugs:
+            print(f"   ⚠️ Slug já existe, geração interrompida: {slug}")
+            self.duplicates.add(target_news['link'])
+            return False
+
+        if target_news.get('image_url'):
+            print(f"   🖼️ Cabeçalho pronto: importando imagem da fonte em paralelo ao texto ({slug})...")
+            job = self.executor.submit(tracing.wrap(self.visuals.ingest_remote_image), target_news['image_url'], slug)
+            generated = False
+        else:
+            print(f"   🎨 Cabeçalho pronto: gerando imagem em paralelo ao texto ({slug})...")
+            title = header.get('title') or target_news['title']
+            job = self.executor.submit(tracing.wrap(self.visuals.generate_and_upload_image), title, slug)
+            generated = True
+        self.images[target_news['link']] = (slug, job, generated)
+        return True
+
+    def image_for(self, target_news, slug):
+        """Returns (started, image_url) for the image started from the header, if any."""
+        job = self.images.pop(target_news['link'], None)
+        if not job:
+            return False, None
+        if job[0] != slug:
+            # The final slug differs from the header's: that image would never be used
+            self._drop(job)
+            return False, None
+        return True, job[1].result()
+
+    def discard(self, target_news):
+        """Drops the image started for an article whose generation failed."""
+        job = self.images.pop(target_news['link'], None)
+        if job:
+            self._drop(job)
+
+    def _drop(self, job):
+        slug, future, generated = job
+        if future.cancel():
+            return
+        # Imported source images stay: the image index hands them to the retry for free
+        if not generated:
             return
 
-        target_news = random.choice(articles_found)
-        print(f"\n🎲 Seleção aleatória entre {len(articles_found)} artigos disponíveis.")
-        print(f"🎯 Notícia selecionada: {target_news['title']}")
-        print(f"   📂 Fonte: {target_news.get('source', 'N/A')}")
+        def remove(future):
+            if not future.cancelled() and not future.exception() and future.result():
+                self.visuals.remove_image(slug)
+        future.add_done_callback(remove)
+
+    def shutdown(self):
+        for job in self.images.values():
+            self._drop(job)
+        self.images.clear()
+        self.executor.shutdown(wait=True)
+
+class _shared(cached_property):
+    """
+    cached_property built under the owner's lock: since Python 3.12
+    cached_property no longer locks, and pipelines running in parallel would
+    otherwise each build their own scraper/queue on the first access.
+    """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._build_lock:
+            return super().__get__(instance, owner)
+
+
+class Services:
+    """
+    Clients, scrapers and local state used by the pipelines. Each one is built
+    on first use and shared by every pipeline (also in --parallel); the daemon
+    keeps a single instance so they stay warm between cycles.
 
+    With a FixtureArchive, HTTP, OpenAI and Gemini go through the archive
+    (recorded or replayed) and Supabase is a local stand-in.
+    """
+
+    def __init__(self, supabase=None, index=None, fixtures=None):
+        self.fixtures = fixtures
+        # Reentrant: ranker builds scraper and clusterer while holding it
+        self._build_lock = threading.RLock()
+        if fixtures:
+            real = create_client(*config.supabase_credentials()) if fixtures.mode == "record" else None
+            supabase = fixtures.supabase(real)
+            # Sessions are created lazily, so every thread picks up the fixture adapter
+            http = default_client()
+            http.adapter = fixtures.http_adapter(http.adapter)
+        self.supabase = supabase or create_client(*config.supabase_credentials())
+        self.index = index or DedupIndex()
+
+    @_shared
+    def scraper(self):
+        return Scraper()
+
+    @_shared
+    def job_scraper(self):
+        return JobScraper()
+
+    @_shared
+    def video_scraper(self):
+        return VideoScraper()
+
+    @_shared
+    def clusterer(self):
+        return StoryClusterer()
+
+    @_shared
+    def queue(self):
+        return WorkQueue()
+
+    @_shared
+    def ranker(self):
+        weights = {source['name']: source.get('weight', 1.0) for source in self.scraper.sources}
+        # Replays rank with the recording's clock, so they choose the same candidates
+        clock = self.fixtures.clock if self.fixtures else None
+        return CandidateRanker(weights, clusterer=self.clusterer, clock=clock)
+
+    @_shared
+    def writer(self):
+        if self.fixtures and self.fixtures.mode == "replay":
+            return ContentGenerator(client=self.fixtures.openai())
         writer = ContentGenerator()
-        article_data = writer.generate_article(target_news)
+        if self.fixtures:
+            writer.client = self.fixtures.openai(writer.client)
+        return writer
 
-        if not article_data:
-            print("❌ Falha na geração do artigo.")
-            return
+    @_shared
+    def visuals(self):
+        visuals = VisualGenerator(self.supabase)
+        if self.fixtures:
+            visuals.client = self.fixtures.gemini(visuals.client)
+        return visuals
 
-        visuals = VisualGenerator()
-        original_image = target_news.get('image_url')
-        
-        if original_image:
-            print(f"🖼️ Usando imagem original da fonte: {original_image}")
-            article_data['image_url'] = original_image
-        else:
-            print("🎨 Imagem original não encontrada. Acionando Nano Banana...")
-            image_url = visuals.generate_and_upload_image(article_data['title'], article_data['slug'])
-            
-            if image_url:
-                article_data['image_url'] = image_url
-            else:
-                article_data['image_url'] = "https://placehold.co/1200x630?text=TechHub" 
+def run_article_pipeline(supabase, index=None, services=None):
+    """Returns a summary dict {found, queued, published[, error]}."""
+    print("\n📰 INICIANDO AUTOMAÇÃO DE ARTIGOS...")
+    summary = {"found": 0, "queued": 0, "published": 0}
+    # One trace per run: stage timings, bytes and token usage end up in the report/traces.jsonl
+    with span("articles") as root:
+        try:
+            # Sync the local URL index to prevent duplicates (PRE-GENERATION CHECK)
+            services = services or Services(supabase, index)
+            index = services.index
+            with span("articles.sync") as sync_span:
+                synced = index.sync(supabase, "posts")
+                index.sync(supabase, "post_slugs")
+                existing_urls = index.view("posts")
+                sync_span.set(known=len(existing_urls), synced=synced)
+            print(f"   ℹ️ {len(existing_urls)} artigos já cadastrados no histórico ({synced} novos sincronizados).")
 
-        print("\n💾 Salvando artigo no Banco de Dados...")
-        existing_post = supabase.table("posts").select("id").eq("slug", article_data['slug']).execute()
-        if existing_post.data:
-            print(f"   ⚠️ Artigo duplicado ignorado (Slug já existe): {article_data['slug']}")
-            return
+            # Candidates already queued count as seen: feeds with nothing else new can answer 304
+            queue = services.queue
+            with span("articles.scrape") as scrape_span:
+                articles_found = services.scraper.get_latest_news(limit=2, existing_urls=existing_urls,
+                                                                  queued_urls=queue.keys())
+                scrape_span.set(articles=len(articles_found))
 
-        payload = {
-            "title": article_data['title'],
-            "slug": article_data['slug'],
-            "content": article_data['content'],
-            "excerpt": article_data['excerpt'],
-            "image_url": article_data['image_url'],
-            "tags": article_data['tags'],
-            "type": article_data['type'],
-            "original_url": article_data.get('original_url'), # Save Source Link
-            "created_at": datetime.datetime.now().isoformat()
-        }
-
-        data = supabase.table("posts").insert(payload).execute()
-        print("✅ Artigo Publicado com Sucesso!")
-        print(f"   ID: {data.data[0]['id']}")
-        
+            # The same story from different sources (different URLs) becomes one candidate
+            clusterer = services.clusterer
+            with span("articles.cluster", candidates=len(articles_found)) as cluster_span:
+                articles_found = clusterer.collapse(articles_found)
+                cluster_span.set(stories=len(articles_found))
+            summary["found"] = len(articles_found)
+
+            # Scraper stage: candidates are scored once and wait in the durable queue, best first
+            with span("articles.enqueue") as enqueue_span:
+                for article in articles_found:
+                    article['rank'] = services.ranker.rank(article)
+                summary["queued"] = queue.enqueue(articles_found, priority=lambda article: article['rank']['priority'])
+                enqueue_span.set(queued=summary["queued"])
+            counts = queue.counts()
+            print(f"   📥 {summary['queued']} novos candidatos na fila "
+                  f"(aguardando: {counts.get('scraped', 0)} coletados, {counts.get('generated', 0)} gerados, "
+                  f"{counts.get('imaged', 0)} com imagem).")
+
+            if not any(counts.get(stage) for stage in STAGES[:-1]):
+                print("📭 Nenhum artigo NOVO encontrado.")
+                return summary
+
+            writer = services.writer
+            visuals = services.visuals
+            early = EarlyStart(index.view("post_slugs"), visuals)
+            try:
+                summary["published"] = process_queue(supabase, index, writer, visuals, early, queue, clusterer,
+                                                     services.ranker)
+            finally:
+                early.shutdown()
+
+        except Exception as e:
+            print(f"❌ Erro no pipeline de artigos: {e}")
+            summary["error"] = str(e)
+            root.fail(e)
+        root.set(**{k: v for k, v in summary.items() if k != "error"})
+    return summary
+
+def process_queue(supabase, index, writer, visuals, early, queue, clusterer=None, ranker=None):
+    """
+    Finishes the items a previous run left half-way (without paying for their
+    text or image again), then generates and publishes new candidates.
+    Returns how many were published.
+    """
+    published = 0
+    resumed = [("imaged", key, item) for key, item in queue.claim("imaged")]
+    resumed += [("generated", key, item) for key, item in queue.claim("generated")]
+    if resumed:
+        print(f"\n♻️ Retomando {len(resumed)} artigos interrompidos em uma execução anterior...")
+    for stage, key, item in resumed:
+        published += finish_item(supabase, index, visuals, queue, key, item, stage, early, clusterer)
+
+    generated = 0
+    for key, item in generate_stage(queue, writer, early, clusterer, ranker):
+        generated += 1
+        published += finish_item(supabase, index, visuals, queue, key, item, "generated", early, clusterer)
+
+    if config.ARTICLES_PER_RUN > 1 or resumed:
+        print(f"\n📊 {published}/{generated + len(resumed)} artigos publicados neste lote.")
+    return published
+
+def generate_stage(queue, writer, early, clusterer=None, ranker=None):
+    """
+    Writer stage (scraped -> generated): claims the best-ranked candidates of
+    the backlog, generates them (streaming; concurrently in batch mode) and
+    yields (key, item) as each generated article is saved in the queue.
+    """
+    backlog = queue.waiting("scraped")
+    claimed = []
+    while len(claimed) < config.ARTICLES_PER_RUN:
+        batch = queue.claim("scraped", limit=config.ARTICLES_PER_RUN - len(claimed))
+        if not batch:
+            break
+        for key, item in batch:
+            # Something close may have been published since the candidate was ranked
+            if clusterer:
+                similarity, title = clusterer.nearest(item["news"])
+                if similarity >= clusterer.threshold:
+                    print(f"   ⚠️ História já publicada, removida da fila: {item['news']['title'][:40]}... (~ {title[:40]}...)")
+                    queue.skip(key, "História já publicada")
+                    continue
+            claimed.append((key, item))
+    if not claimed:
+        return
+
+    if config.ARTICLES_PER_RUN > 1:
+        print(f"\n🏆 {len(claimed)} melhores entre {backlog} artigos na fila.")
+    else:
+        print(f"\n🏆 Melhor candidato entre {backlog} artigos na fila.")
+    for position, (_, item) in enumerate(claimed, 1):
+        rank = item["news"].get("rank")
+        if rank and ranker:
+            print(f"   ⭐ #{position} {item['news']['title'][:50]}... score={ranker.score(rank['priority']):.3f} "
+                  f"(recência={rank['recency']}, tags={rank['tags']}, fonte={rank['source']}, novidade={rank['novelty']})")
+    news = {key: item["news"] for key, item in claimed}
+
+    if config.ARTICLES_PER_RUN > 1:
+        # Batch mode: generate several candidates concurrently, publish as each one finishes
+        results = writer.generate_articles(news.values(), on_header=early)
+    else:
+        target_news = claimed[0][1]["news"]
+        print(f"🎯 Notícia selecionada: {target_news['title']}")
+        print(f"   📂 Fonte: {target_news.get('source', 'N/A')}")
+        results = [(target_news, writer.generate_article(target_news, on_header=early))]
+
+    keys = {target_news['link']: key for key, target_news in news.items()}
+    for target_news, article_data in results:
+        key = keys[target_news['link']]
+        if not article_data:
+            if target_news['link'] in early.duplicates:
+                queue.skip(key, "Slug já existe")
+            else:
+                print(f"❌ Falha na geração do artigo: {target_news['title']}")
+                early.discard(target_news)
+                queue.fail(key, "Falha na geração")
+            continue
+        item = {"news": target_news, "article": article_data}
+        queue.advance(key, "generated", item)
+        yield key, item
+
+def finish_item(supabase, index, visuals, queue, key, item, stage, early=None, clusterer=None):
+    """Runs the remaining stages of a claimed item. Returns True when it was published."""
+    try:
+        if stage == "generated":
+            item = image_stage(visuals, item, early)
+            queue.advance(key, "imaged", item)
+        published = publish_stage(supabase, index, item, clusterer)
     except Exception as e:
-        print(f"❌ Erro no pipeline de artigos: {e}")
+        print(f"❌ Erro ao publicar '{item['news']['title']}': {e}")
+        queue.fail(key, e)
+        return False
+
+    if published:
+        queue.advance(key, "published", item)
+    else:
+        queue.skip(key, "Slug já existe")
+    return published
+
+def image_stage(visuals, item, early=None):
+    """Visual stage (generated -> imaged): attaches the cover image to the generated article."""
+    target_news, article_data = item["news"], item["article"]
+    original_image = target_news.get('image_url')
+    slug = article_data['slug']
+    with span("articles.image", slug=slug) as image_span:
+        started, image_url = early.image_for(target_news, slug) if early else (False, None)
+        image_span.set(early=started)
+
+        if original_image and not started:
+            # Copy the source image to our bucket instead of hotlinking the origin
+            print(f"🖼️ Importando imagem original da fonte: {original_image}")
+            image_url = visuals.ingest_remote_image(original_image, slug)
 
-def run_job_pipeline(supabase):
+        # Nano Banana when there is no usable source image (and it wasn't already tried early)
+        if not image_url and (original_image or not started):
+            print("🎨 Imagem original indisponível. Acionando Nano Banana...")
+            image_url = visuals.generate_and_upload_image(article_data['title'], slug)
+
+        if not image_url:
+            image_span.set(placeholder=True)
+    article_data['image_url'] = image_url or "https://placehold.co/1200x630?text=TechHub"
+    return item
+
+def publish_stage(supabase, index, item, clusterer=None):
+    """Insert stage (imaged -> published): saves the article. Returns True when inserted."""
+    target_news, article_data = item["news"], item["article"]
+    print("\n💾 Salvando artigo no Banco de Dados...")
+    payload = post_row(article_data)
+
+    # Local slug index first (resumed items never went through EarlyStart's check)
+    if payload['slug'] in index.view("post_slugs"):
+        print(f"   ⚠️ Artigo duplicado ignorado (Slug já existe): {article_data['slug']}")
+        return False
+
+    # Upsert ignoring duplicates: the unique index on slug also covers concurrent runs
+    with span("articles.insert", slug=payload['slug'], bytes=len(json.dumps(payload))) as insert_span:
+        result = BulkWriter(supabase).write("posts", [payload])
+        insert_span.set(inserted=len(result.inserted))
+    index.add("post_slugs", [payload['slug']])
+    if not result.inserted:
+        print(f"   ⚠️ Artigo duplicado ignorado (Slug já existe): {article_data['slug']}")
+        return False
+
+    index.add("posts", [payload['original_url']])
+    if clusterer:
+        clusterer.add(target_news)
+    print("✅ Artigo Publicado com Sucesso!")
+    print(f"   ID: {result.inserted[0]['id']}")
+    return True
+
+def run_job_pipeline(supabase, index=None, services=None):
+    """Returns a summary dict {inserted, skipped[, error]}."""
     print("\n💼 INICIANDO AUTOMAÇÃO DE VAGAS...")
+    summary = {"inserted": 0, "skipped": 0}
     try:
-        existing_jobs = supabase.table("jobs").select("apply_url").execute()
-        existing_job_urls = [row['apply_url'] for row in existing_jobs.data] if existing_jobs.data else []
-        print(f"   ℹ️ {len(existing_job_urls)} vagas já cadastradas no banco.")
+        services = services or Services(supabase, index)
+        index = services.index
+        synced = index.sync(supabase, "jobs")
+        existing_job_urls = index.view("jobs")
+        print(f"   ℹ️ {len(existing_job_urls)} vagas já cadastradas no banco ({synced} novas sincronizadas).")
 
-        job_scraper = JobScraper()
-        jobs = job_scraper.get_latest_jobs(limit=5, existing_urls=existing_job_urls)
+        jobs = services.job_scraper.get_latest_jobs(limit=5, existing_urls=existing_job_urls)
         
         if jobs:
             print(f"   Salvando {len(jobs)} vagas no banco...")
-            data = supabase.table("jobs").insert(jobs).execute()
-            print("✅ Vagas salvas com sucesso!")
+            result = BulkWriter(supabase).write("jobs", jobs)
+            index.add("jobs", [j['apply_url'] for j in jobs])
+            summary["inserted"] = len(result.inserted)
+            summary["skipped"] = result.skipped
+            print(f"✅ Vagas salvas com sucesso! ({len(result.inserted)} novas, {result.skipped} já existiam)")
         else:
             print("   Nenhuma vaga nova encontrada.")
     except Exception as e:
         print(f"❌ Erro no módulo de vagas: {e}")
+        summary["error"] = str(e)
+    return summary
 
-def run_video_pipeline(supabase):
+def run_video_pipeline(supabase, index=None, services=None):
+    """Returns a summary dict {inserted, skipped[, error]}."""
     print("\n🎬 INICIANDO AUTOMAÇÃO DE VÍDEOS...")
+    summary = {"inserted": 0, "skipped": 0}
     try:
-        existing_data = supabase.table("videos").select("url").execute()
-        existing_urls = [row['url'] for row in existing_data.data] if existing_data.data else []
-        print(f"   ℹ️ {len(existing_urls)} vídeos já cadastrados no banco.")
+        services = services or Services(supabase, index)
+        index = services.index
+        synced = index.sync(supabase, "videos")
+        existing_urls = index.view("videos")
+        print(f"   ℹ️ {len(existing_urls)} vídeos já cadastrados no banco ({synced} novos sincronizados).")
 
-        video_scraper = VideoScraper()
-        videos = video_scraper.get_latest_videos(limit=5, existing_urls=existing_urls)
+        videos = services.video_scraper.get_latest_videos(limit=5, existing_urls=existing_urls)
         
         if videos:
             print(f"   Salvando {len(videos)} vídeos no banco...")
-            db_videos = []
-            for v in videos:
-                db_videos.append({
-                    "title": v['title'],
-                    "thumbnail": v['thumbnail'], 
-                    "url": v['url'],
-                    "channel": v['author'],
-                    "views": 0, 
-                    "duration": v['duration'],
-                    "published_at": v['published_at'],
-                    "tags": v.get('tags', ["Tech", "Video"]) 
-                })
-
-            data = supabase.table("videos").insert(db_videos).execute()
-            print("✅ Vídeos salvos com sucesso!")
+            db_videos = [video_row(v) for v in videos]
+
+            result = BulkWriter(supabase).write("videos", db_videos)
+            index.add("videos", [v['url'] for v in db_videos])
+            summary["inserted"] = len(result.inserted)
+            summary["skipped"] = result.skipped
+            print(f"✅ Vídeos salvos com sucesso! ({len(result.inserted)} novos, {result.skipped} já existiam)")
         else:
             print("   Nenhum vídeo novo encontrado.")
     except Exception as e:
             print(f"❌ Erro no módulo de vídeos: {e}")
+            summary["error"] = str(e)
+    return summary
 
-def main_pipeline():
+def main_pipeline(services=None):
     print("🚀 Iniciando Pipeline do TechBub Backend...")
     
-    supabase = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+    services = services or Services()
 
-    run_article_pipeline(supabase)
-    run_job_pipeline(supabase)
-    run_video_pipeline(supabase)
+    run_article_pipeline(services.supabase, services=services)
+    run_job_pipeline(services.supabase, services=services)
+    run_video_pipeline(services.supabase, services=services)
 
     print("\n🏁 Pipeline finalizado!")
 
+def main_pipeline_parallel(services=None):
+    """Runs the three pipelines at the same time: the run takes as long as the slowest one."""
+    print("🚀 Iniciando Pipeline do TechBub Backend (pipelines em paralelo)...")
+    started = time.monotonic()
+    # One Services for the three pipelines: clients, scrapers, queue and index are shared between threads
+    services = services or Services()
+
+    summaries = run_concurrently(
+        {
+            "artigos": lambda: run_article_pipeline(services.supabase, services=services),
+            "vagas": lambda: run_job_pipeline(services.supabase, services=services),
+            "videos": lambda: run_video_pipeline(services.supabase, services=services),
+        },
+        timeout={
+            "artigos": config.ARTICLES_TIMEOUT_MINUTES * 60,
+            "vagas": config.JOBS_TIMEOUT_MINUTES * 60,
+            "videos": config.VIDEOS_TIMEOUT_MINUTES * 60,
+        },
+        deadline=config.RUN_DEADLINE_MINUTES * 60,
+    )
+    print_summary(summaries, time.monotonic() - started)
+    print("\n🏁 Pipeline finalizado!")
+    return summaries
+
+def run_with_fixtures(path, mode, parallel=False):
+    """
+    --record: live feeds/OpenAI/Gemini captured into `path`, with a local copy
+    of Supabase (nothing is published). --replay: the same run offline, from
+    `path`. Local state starts empty in both, so a replay repeats the recording.
+    """
+    storage.CACHE_DIR = tempfile.mkdtemp(prefix="techub-fixtures-")
+    fixtures = FixtureArchive(path, mode)
+    services = Services(fixtures=fixtures)
+    started = time.monotonic()
+    try:
+        if parallel:
+            main_pipeline_parallel(services)
+        else:
+            main_pipeline(services)
+    finally:
+        fixtures.save()
+    written = ", ".join(f"{count} em {table}" for table, count in services.supabase.inserted.items()) or "nada"
+    print(f"🧪 Banco local: {written}; {len(services.supabase.files)} arquivos no Storage. "
+          f"Tempo total: {time.monotonic() - started:.1f}s")
+
+def run_daemon():
+    """Keeps running: each pipeline on its own interval, sharing warm clients and indexes."""
+    print("🚀 Iniciando TechBub Backend em modo daemon...")
+    services = Services()
+
+    daemon = PipelineDaemon(health_port=config.HEALTH_PORT)
+    daemon.add("artigos", lambda: run_article_pipeline(services.supabase, services=services),
+               config.DAEMON_ARTICLES_MINUTES * 60)
+    daemon.add("vagas", lambda: run_job_pipeline(services.supabase, services=services),
+               config.DAEMON_JOBS_MINUTES * 60)
+    daemon.add("videos", lambda: run_video_pipeline(services.supabase, services=services),
+               config.DAEMON_VIDEOS_MINUTES * 60)
+    daemon.run()
+
 if __name__ == "__main__":
-    main_pipeline()
+    parser = argparse.ArgumentParser(description="Automação de conteúdo do TechHub")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Processo residente: roda os pipelines em intervalos próprios")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Roda artigos, vagas e vídeos ao mesmo tempo, com tempo limite")
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument("--record", metavar="ARQUIVO.zip",
+                          help="Grava as respostas de feeds, OpenAI e Gemini (sem publicar no Supabase)")
+    fixtures.add_argument("--replay", metavar="ARQUIVO.zip",
+                          help="Roda offline a partir de fixtures gravadas com --record")
+    args = parser.parse_args()
+
+    if (args.record or args.replay) and args.daemon:
+        parser.error("--record/--replay não funcionam com --daemon")
+
+    if args.record or args.replay:
+        run_with_fixtures(args.record or args.replay, "record" if args.record else "replay", args.parallel)
+    elif args.daemon:
+        run_daemon()
+    elif args.parallel:
+        main_pipeline_parallel()
+    else:
+        main_pipeline()
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.ratelimit import TokenBucket
+from modules.storage import cache_path
+import config
+
+
+class BackfillCheckpoint:
+    """
+    Progress of a backfill saved to disk after every step, so an interrupted
+    run resumes without regenerating images that were already uploaded.
+    """
+
+    def __init__(self, name="backfill_checkpoint.json"):
+        self.path = cache_path(name)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        # post id -> public URL already uploaded whose DB update is still pending
+        self.uploaded = data.get("uploaded", {})
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"uploaded": self.uploaded}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def mark_uploaded(self, post_id, image_url):
+        with self._lock:
+            self.uploaded[str(post_id)] = image_url
+            self._save()
+
+    def mark_done(self, post_id):
+        with self._lock:
+            if self.uploaded.pop(str(post_id), None) is not None:
+                self._save()
+
+
+class BackfillEngine:
+    """
+    Generates and uploads cover images for many posts at once.
+
+    Gemini calls run on `workers` threads but are paced by a token bucket set to
+    the account quota (GEMINI_RPM); each finished image is handed to a separate
+    upload pool, so Storage uploads and DB updates overlap with generation.
+    """
+
+    def __init__(self, supabase, visuals, workers=None, rate_per_minute=None, upload_workers=4,
+                 checkpoint=None):
+        self.supabase = supabase
+        self.visuals = visuals
+        self.workers = workers or config.BACKFILL_WORKERS
+        self.bucket = TokenBucket(rate_per_minute or config.GEMINI_RPM)
+        self.upload_workers = upload_workers
+        self.checkpoint = checkpoint or BackfillCheckpoint()
+
+    def _update_post(self, post, image_url):
+        self.supabase.table("posts").update({"image_url": image_url}).eq("id", post["id"]).execute()
+        self.checkpoint.mark_done(post["id"])
+        print(f"   ✅ [{post['slug']}] Post atualizado: {image_url}")
+        return True
+
+    def _upload(self, post, image_bytes):
+        image_url = self.visuals.upload_image(post["slug"], image_bytes)
+        if not image_url:
+            return False
+        self.checkpoint.mark_uploaded(post["id"], image_url)
+        return self._update_post(post, image_url)
+
+    def _generate(self, post, uploads):
+        self.bucket.acquire()
+        image_bytes = self.visuals.generate_image(post["title"])
+        if not image_bytes:
+            print(f"   ❌ [{post['slug']}] Falha na geração da imagem")
+            return None
+        return uploads.submit(self._upload, post, image_bytes)
+
+    def run(self, posts):
+        """Processes the posts and returns (success, failed)."""
+        success = 0
+        failed = 0
+        pending = []
+
+        for post in posts:
+            key = str(post["id"])
+            if key in self.checkpoint.uploaded:
+                # Image already in Storage from an interrupted run: only the DB update is missing
+                try:
+                    self._update_post(post, self.checkpoint.uploaded[key])
+                    success += 1
+                except Exception as e:
+                    print(f"   ❌ [{post['slug']}] Erro ao atualizar: {e}")
+                    failed += 1
+            else:
+                pending.append(post)
+
+        if not pending:
+            return success, failed
+
+        print(f"⚙️ Backfill: {len(pending)} posts, {self.workers} workers, "
+              f"{self.bucket.rate * 60:g} imagens/min")
+
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as uploads, \
+                ThreadPoolExecutor(max_workers=self.workers) as generators:
+            generations = {generators.submit(self._generate, post, uploads): post for post in pending}
+            upload_futures = {}
+
+            for future in as_completed(generations):
+                post = generations[future]
+                try:
+                    upload_future = future.result()
+                except Exception as e:
+                    print(f"   ❌ [{post['slug']}] Erro: {e}")
+                    upload_future = None
+                if upload_future is None:
+                    failed += 1
+                else:
+                    upload_futures[upload_future] = post
+
+            for future in as_completed(upload_futures):
+                post = upload_futures[future]
+                try:
+                    ok = future.result()
+                except Exception as e:
+                    print(f"   ❌ [{post['slug']}] Erro no upload/atualização: {e}")
+                    ok = False
+                if ok:
+                    success += 1
+                else:
+                    failed += 1
+
+        return success, failed
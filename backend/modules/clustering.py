@@ -0,0 +1,249 @@
+import hashlib
+import random
+import re
+import struct
+import time
+from contextlib import closing
+from modules.storage import connect
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TAG_RE = re.compile(r"<[^>]+>")
+# Words keep inner dots/dashes, so versions stay one token ("gpt-5", "3.15", "node.js")
+_WORD_RE = re.compile(r"\w+(?:[.\-]\w+)*")
+
+# Function words (EN/PT), feed boilerplate ("submitted by ... [link] [comments]", "Show HN:")
+# and the generic verbs of release news, which unrelated stories share
+_STOPWORDS = frozenset("""
+a an the and or of to in on for with by at from as is are was be its it this that our we you your their
+has have new how what why now out here today can will into about after over up more most than just via vs
+submitted link comments read continue reading post appeared first show ask hn
+release releases released launch launches launched version versions announces announced announcing
+introduces introducing unveils ships shipped available update updates brings adds build built building use using
+de da do das dos e o os as um uma para com em no na nos nas por que se sua seu mais como
+lança lançado lançada lançamento versão anuncia disponível
+""".split())
+
+
+class StoryClusterer:
+    """
+    Collapses the same story reported by different sources (different URLs)
+    into one candidate, using MinHash signatures and an LSH index.
+
+    An article is the set of words of its title plus the lede of its summary
+    (`summary_words`), so the title carries most of the weight. Rewrites of one
+    story share few words overall, and aggregator entries are often just a
+    title, so the score is the overlap coefficient |A∩B| / min(|A|, |B|),
+    derived from the MinHash Jaccard estimate and the set sizes. The overlap
+    only counts once the articles share `min_shared` distinctive words;
+    below that ("Claude" vs "Anthropic releases Claude 4", "Vue 3.5" vs
+    "Nuxt 3.5") the score is the Jaccard estimate scaled by the share of
+    `min_shared` reached, so one or two common words never merge two stories
+    while identical short titles still do.
+
+    Within a run, near-duplicate candidates are merged into the best-looking
+    one. Across runs, stories that were already published are kept in a
+    SQLite LSH index (for `ttl_days`) and matching candidates are dropped.
+    Bands of one row make any shared word a candidate pair; the overlap
+    estimate then decides.
+    """
+
+    def __init__(self, db_name="story_lsh.sqlite3", num_perm=256, bands=256, threshold=0.3,
+                 min_shared=3, summary_words=15, ttl_days=30):
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands")
+        self.db_name = db_name
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.min_shared = min_shared
+        self.summary_words = summary_words
+        self.ttl = ttl_days * 86400
+
+        # Fixed seed: signatures must stay comparable with the ones already stored
+        rng = random.Random(1337)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+        with closing(connect(self.db_name)) as conn, conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(stories)")]
+            legacy = []
+            if columns and "size" not in columns:
+                # Signatures of the old word-trigram scheme aren't comparable: re-sign the titles
+                legacy = conn.execute("SELECT url, title, created_at FROM stories").fetchall()
+                conn.execute("DROP TABLE stories")
+                conn.execute("DROP TABLE IF EXISTS buckets")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stories ("
+                " id INTEGER PRIMARY KEY, url TEXT, title TEXT, signature BLOB, size INTEGER, created_at REAL"
+                ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " band INTEGER, hash TEXT, story_id INTEGER, PRIMARY KEY (band, hash, story_id)"
+                ") WITHOUT ROWID"
+            )
+            for url, title, created_at in legacy:
+                self._insert(conn, {"link": url, "title": title or ""}, created_at)
+
+    def _words(self, text, limit=None):
+        words = [w.strip(".-") for w in _WORD_RE.findall(_TAG_RE.sub(" ", text or "").lower())]
+        words = [w for w in words if w not in _STOPWORDS and (len(w) > 1 or w.isdigit())]
+        return words[:limit] if limit is not None else words
+
+    def _shingles(self, article):
+        return set(self._words(article.get('title'))) | set(self._words(article.get('summary'), self.summary_words))
+
+    def signature(self, article):
+        """(MinHash signature as a tuple of num_perm ints, word count) of the article."""
+        shingles = self._shingles(article)
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in shingles
+        ]
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm, 0
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._perms
+        ), len(hashes)
+
+    def similarity(self, sig_a, sig_b):
+        """
+        Estimated overlap coefficient |A∩B| / min(|A|, |B|) between two
+        signatures, or their Jaccard estimate scaled down when they share
+        fewer than `min_shared` words.
+        """
+        (minhash_a, size_a), (minhash_b, size_b) = sig_a, sig_b
+        if not size_a or not size_b:
+            return 0.0
+        jaccard = sum(1 for x, y in zip(minhash_a, minhash_b) if x == y) / self.num_perm
+        # |A∩B| = J(|A| + |B|) / (1 + J)
+        shared = jaccard * (size_a + size_b) / (1 + jaccard)
+        if round(shared) < self.min_shared:
+            return jaccard * round(shared) / self.min_shared
+        return min(1.0, shared / min(size_a, size_b))
+
+    def _band_keys(self, signature):
+        minhash, size = signature
+        if not size:
+            return
+        for band in range(self.bands):
+            chunk = minhash[band * self.rows:(band + 1) * self.rows]
+            yield band, hashlib.blake2b(struct.pack(f"<{self.rows}I", *chunk), digest_size=8).hexdigest()
+
+    def _pack(self, signature):
+        return struct.pack(f"<{self.num_perm}I", *signature[0])
+
+    def _unpack(self, blob, size):
+        return struct.unpack(f"<{self.num_perm}I", blob), size
+
+    def _nearest(self, conn, signature):
+        """Returns (similarity, title) of the closest published story sharing a band, or (0.0, None)."""
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            for (story_id,) in conn.execute(
+                "SELECT story_id FROM buckets WHERE band = ? AND hash = ?", (band, key)
+            ):
+                candidates.add(story_id)
+        best = (0.0, None)
+        for story_id in candidates:
+            row = conn.execute("SELECT title, signature, size FROM stories WHERE id = ?", (story_id,)).fetchone()
+            if row:
+                similarity = self.similarity(signature, self._unpack(row[1], row[2]))
+                best = max(best, (similarity, row[0]), key=lambda x: x[0])
+        return best
+
+    def _published_match(self, conn, signature):
+        """Returns the title of a published story similar to this signature, if any."""
+        similarity, title = self._nearest(conn, signature)
+        return title if similarity >= self.threshold else None
+
+    def nearest(self, article):
+        """(similarity, title) of the published story closest to `article`; (0.0, None) if none is near."""
+        with closing(connect(self.db_name)) as conn:
+            return self._nearest(conn, self.signature(article))
+
+    @staticmethod
+    def _canonical_rank(article):
+        # Prefer the version with an image and the richest summary
+        return (bool(article.get('image_url')), len(article.get('summary') or ""))
+
+    def collapse(self, articles):
+        """
+        Returns one canonical candidate per story. The canonical article gets
+        `cluster_sources` (every source that reported it) and `cluster_size`.
+        """
+        if not articles:
+            return []
+
+        signatures = [self.signature(a) for a in articles]
+        parent = list(range(len(articles)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            for key in self._band_keys(signature):
+                for j in buckets.get(key, ()):
+                    if find(i) != find(j) and self.similarity(signature, signatures[j]) >= self.threshold:
+                        parent[find(i)] = find(j)
+                buckets.setdefault(key, []).append(i)
+
+        # Clusters come out in the order their first member was scraped
+        clusters = {}
+        for i in range(len(articles)):
+            clusters.setdefault(find(i), []).append(i)
+
+        result = []
+        dropped = 0
+        with closing(connect(self.db_name)) as conn:
+            for members in clusters.values():
+                best = max(members, key=lambda i: self._canonical_rank(articles[i]))
+                canonical = dict(articles[best])
+                canonical['cluster_sources'] = [articles[i].get('source') for i in members]
+                canonical['cluster_size'] = len(members)
+
+                published_title = self._published_match(conn, signatures[best])
+                if published_title:
+                    print(f"      ⚠️ História já publicada ignorada: {canonical['title'][:40]}... (~ {published_title[:40]}...)")
+                    dropped += 1
+                    continue
+                if len(members) > 1:
+                    print(f"      🔗 {len(members)} fontes agrupadas em uma história: {canonical['title'][:50]}...")
+                result.append(canonical)
+
+        print(f"🧩 Agrupamento: {len(articles)} candidatos -> {len(result)} histórias únicas ({dropped} já publicadas).")
+        return result
+
+    def add(self, article):
+        """Records a published story so later runs drop its near-duplicates."""
+        now = time.time()
+        with closing(connect(self.db_name)) as conn, conn:
+            self._insert(conn, article, now)
+            self._expire(conn, now)
+
+    def _insert(self, conn, article, created_at):
+        signature = self.signature(article)
+        cursor = conn.execute(
+            "INSERT INTO stories (url, title, signature, size, created_at) VALUES (?, ?, ?, ?, ?)",
+            (article.get('link'), article.get('title'), self._pack(signature), signature[1], created_at)
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO buckets (band, hash, story_id) VALUES (?, ?, ?)",
+            [(band, key, cursor.lastrowid) for band, key in self._band_keys(signature)]
+        )
+
+    def _expire(self, conn, now):
+        if not self.ttl:
+            return
+        conn.execute(
+            "DELETE FROM buckets WHERE story_id IN (SELECT id FROM stories WHERE created_at < ?)",
+            (now - self.ttl,)
+        )
+        conn.execute("DELETE FROM stories WHERE created_at < ?", (now - self.ttl,))
@@ -0,0 +1,127 @@
+import json
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PipelineDaemon:
+    """
+    Resident worker: runs each pipeline on its own interval in its own thread,
+    reusing whatever state the pipeline functions close over (clients, pools,
+    dedup index) instead of paying the start-up cost on every cron invocation.
+
+    SIGTERM/SIGINT stop scheduling new cycles and let running ones finish.
+    An optional HTTP endpoint (GET /health) reports the state of each pipeline.
+    """
+
+    def __init__(self, health_port=None):
+        self.health_port = health_port
+        self.stopping = threading.Event()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add(self, name, func, interval):
+        """Registers `func()` to run every `interval` seconds (first run right away)."""
+        self._jobs[name] = {
+            "func": func,
+            "interval": interval,
+            "runs": 0,
+            "failures": 0,
+            "running": False,
+            "last_start": None,
+            "last_end": None,
+            "last_error": None,
+            "next_run": time.time(),
+        }
+
+    def _loop(self, name):
+        job = self._jobs[name]
+        while not self.stopping.is_set():
+            delay = job["next_run"] - time.time()
+            if delay > 0 and self.stopping.wait(delay):
+                break
+
+            with self._lock:
+                job["running"] = True
+                job["last_start"] = time.time()
+            error = None
+            try:
+                summary = job["func"]()
+                # Pipelines catch their own errors and report them in the returned summary
+                if isinstance(summary, dict):
+                    error = summary.get("error")
+            except Exception as e:
+                error = str(e)
+                print(f"❌ [{name}] Ciclo falhou: {e}")
+            with self._lock:
+                job["running"] = False
+                job["runs"] += 1
+                job["last_end"] = time.time()
+                job["last_error"] = error
+                if error:
+                    job["failures"] += 1
+                # Interval counts from the start, so cycles don't drift by their own duration
+                job["next_run"] = max(job["last_start"] + job["interval"], job["last_end"])
+            if not self.stopping.is_set():
+                print(f"⏰ [{name}] Próximo ciclo em {max(0, job['next_run'] - time.time()) / 60:.0f} min.")
+
+    def status(self):
+        """Snapshot of the daemon state (served by the health endpoint)."""
+        with self._lock:
+            pipelines = {
+                name: {key: value for key, value in job.items() if key != "func"}
+                for name, job in self._jobs.items()
+            }
+        return {"status": "stopping" if self.stopping.is_set() else "ok", "pipelines": pipelines}
+
+    def _serve_health(self):
+        daemon = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/health"):
+                    self.send_error(404)
+                    return
+                status = daemon.status()
+                body = json.dumps(status).encode("utf-8")
+                self.send_response(200 if status["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Probes would flood the log
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", self.health_port), HealthHandler)
+        threading.Thread(target=self._server.serve_forever, name="health", daemon=True).start()
+        print(f"🩺 Health check em http://0.0.0.0:{self.health_port}/health")
+
+    def stop(self, *_):
+        if not self.stopping.is_set():
+            print("\n🛑 Encerrando: aguardando os ciclos em andamento terminarem...")
+        self.stopping.set()
+
+    def run(self):
+        """Blocks until SIGTERM/SIGINT, then waits for the running cycles."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        if self.health_port:
+            self._serve_health()
+
+        threads = [
+            threading.Thread(target=self._loop, args=(name,), name=name)
+            for name in self._jobs
+        ]
+        for thread in threads:
+            thread.start()
+        # Short waits keep the main thread responsive to signals
+        while not self.stopping.wait(1):
+            pass
+        for thread in threads:
+            thread.join()
+        if self._server:
+            self._server.shutdown()
+        print("👋 Daemon finalizado.")
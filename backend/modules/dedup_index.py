@@ -0,0 +1,208 @@
+from contextlib import closing
+from urllib.parse import urlparse, urlunparse
+import config
+from modules.storage import connect
+from modules.bloom import BloomFilter, SeenUrls
+
+# False positive rate of the Bloom pre-check (hits are confirmed against SQLite anyway)
+BLOOM_ERROR_RATE = config.DEDUP_BLOOM_ERROR_RATE
+
+
+def normalize_url(url):
+    """
+    Removes query parameters and trailing slashes to ensure unique URL detection
+    regardless of tracking params (utm_source, etc).
+    """
+    if not url: return " "
+    try:
+        parsed = urlparse(url)
+        # Reconstruct without query (?) or fragment (#)
+        clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
+        return clean_url.rstrip('/')
+    except Exception:
+        return url.rstrip('/')
+
+
+class IndexView:
+    """Exact (SQLite-backed) view of one table of the index, usable with `in` like a set."""
+
+    def __init__(self, index, table):
+        self.index = index
+        self.table = table
+
+    def __contains__(self, url):
+        return self.index.contains(self.table, url)
+
+    def __len__(self):
+        return self.index.count(self.table)
+
+    def __iter__(self):
+        return self.index.iter_urls(self.table)
+
+
+def as_lookup(urls, normalize=None):
+    """Turns known URLs (a list or an index view) into a SeenUrls lookup."""
+    if isinstance(urls, SeenUrls):
+        return urls
+    return SeenUrls(urls, normalize=normalize, error_rate=BLOOM_ERROR_RATE)
+
+
+class DedupIndex:
+    """
+    Local SQLite copy of the URLs already stored in Supabase.
+
+    Each sync only downloads rows newer than the last seen `created_at`
+    (watermark), paginated, so startup cost no longer grows with the catalog.
+    Jobs keep the posting date in `created_at`, so rows we insert must also be
+    added locally with add() — older dates would fall behind the watermark.
+    """
+
+    # Index kind -> (Supabase table, column holding the value used for deduplication)
+    TABLES = {
+        "posts": ("posts", "original_url"),
+        "jobs": ("jobs", "apply_url"),
+        "videos": ("videos", "url"),
+        # Slugs of published posts: a generated slug is checked without a query
+        "post_slugs": ("posts", "slug"),
+    }
+    PAGE_SIZE = 1000
+
+    def __init__(self, db_name="dedup_index.sqlite3", error_rate=BLOOM_ERROR_RATE):
+        self.db_name = db_name
+        self.error_rate = error_rate
+        self._lookups = {}
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                " tbl TEXT NOT NULL, url TEXT NOT NULL, PRIMARY KEY (tbl, url)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks (tbl TEXT PRIMARY KEY, created_at TEXT)"
+            )
+            # Saved Bloom filters, so a run doesn't rehash the whole index on startup
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blooms ("
+                " tbl TEXT PRIMARY KEY, capacity INTEGER, error_rate REAL, count INTEGER, bits BLOB"
+                ")"
+            )
+
+    def _key(self, table, url):
+        # Article links carry tracking params; job/video URLs are compared verbatim
+        # (a YouTube watch URL is only unique because of its query string)
+        return normalize_url(url) if table == "posts" else url
+
+    def sync(self, supabase, table):
+        """Pulls rows created since the watermark. Returns how many URLs were new."""
+        source, column = self.TABLES[table]
+        self.view(table)  # Load the Bloom filter first so synced rows are added to it
+        with closing(connect(self.db_name)) as conn:
+            row = conn.execute("SELECT created_at FROM watermarks WHERE tbl = ?", (table,)).fetchone()
+        watermark = row[0] if row else None
+
+        added = 0
+        latest = watermark
+        start = 0
+        while True:
+            query = supabase.table(source).select(f"{column}, created_at")
+            if watermark:
+                # gte: rows sharing the watermark timestamp may have arrived after the last sync
+                query = query.gte("created_at", watermark)
+            page = query.order("created_at").order("id").range(start, start + self.PAGE_SIZE - 1).execute()
+            rows = page.data or []
+
+            added += self.add(table, [r[column] for r in rows])
+            for r in rows:
+                if r.get("created_at") and (latest is None or r["created_at"] > latest):
+                    latest = r["created_at"]
+
+            if len(rows) < self.PAGE_SIZE:
+                break
+            start += self.PAGE_SIZE
+
+        if latest != watermark:
+            with closing(connect(self.db_name)) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO watermarks (tbl, created_at) VALUES (?, ?)",
+                    (table, latest)
+                )
+        return added
+
+    def add(self, table, urls):
+        """Adds URLs to the index. Returns how many were not there yet."""
+        keys = {self._key(table, u) for u in urls if u}
+        if not keys:
+            return 0
+        added = []
+        with closing(connect(self.db_name)) as conn, conn:
+            for key in keys:
+                # rowcount is 0 when the key was already indexed
+                if conn.execute("INSERT OR IGNORE INTO urls (tbl, url) VALUES (?, ?)", (table, key)).rowcount:
+                    added.append(key)
+
+        # Only new keys go into the filter: its count drives the rebuild check and the error rate
+        if added and table in self._lookups:
+            bloom = self._lookups[table].bloom
+            for key in added:
+                bloom.add(key)
+            self._save_bloom(table, bloom)
+        return len(added)
+
+    def contains(self, table, url):
+        with closing(connect(self.db_name)) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM urls WHERE tbl = ? AND url = ?", (table, self._key(table, url))
+            ).fetchone()
+        return row is not None
+
+    def count(self, table):
+        with closing(connect(self.db_name)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM urls WHERE tbl = ?", (table,)).fetchone()[0]
+
+    def iter_urls(self, table):
+        """Streams the URLs of a table without loading them all in memory."""
+        with closing(connect(self.db_name)) as conn:
+            for row in conn.execute("SELECT url FROM urls WHERE tbl = ?", (table,)):
+                yield row[0]
+
+    def _load_bloom(self, table, count):
+        with closing(connect(self.db_name)) as conn:
+            row = conn.execute(
+                "SELECT capacity, error_rate, count, bits FROM blooms WHERE tbl = ?", (table,)
+            ).fetchone()
+        if not row:
+            return None
+        capacity, error_rate, saved_count, bits = row
+        # Rebuild when the settings changed, the filter is full or rows were added behind its back
+        if error_rate != self.error_rate or count > capacity or saved_count < count:
+            return None
+        try:
+            return BloomFilter.from_bytes(bits, capacity, error_rate, saved_count)
+        except ValueError:
+            return None
+
+    def _save_bloom(self, table, bloom):
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO blooms (tbl, capacity, error_rate, count, bits) VALUES (?, ?, ?, ?, ?)",
+                (table, bloom.capacity, bloom.error_rate, bloom.count, bytes(bloom.bits))
+            )
+
+    def view(self, table):
+        """
+        Returns a SeenUrls lookup for the table: Bloom pre-check in memory,
+        exact confirmation in SQLite. The filter is persisted and kept in sync by add().
+        """
+        if table not in self._lookups:
+            exact = IndexView(self, table)
+            normalize = normalize_url if table == "posts" else None
+            count = self.count(table)
+            bloom = self._load_bloom(table, count)
+            lookup = SeenUrls(
+                self.iter_urls(table) if bloom is None else (), exact=exact, normalize=normalize,
+                capacity=count, error_rate=self.error_rate, bloom=bloom
+            )
+            if bloom is None:
+                self._save_bloom(table, lookup.bloom)
+            self._lookups[table] = lookup
+        return self._lookups[table]
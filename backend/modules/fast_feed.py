@@ -0,0 +1,209 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from feedparser import FeedParserDict
+
+# Namespaces of the few extension elements we read
+_MEDIA = "http://search.yahoo.com/mrss/"
+_YOUTUBE = "http://www.youtube.com/xml/schemas/2015"
+_CONTENT = "http://purl.org/rss/1.0/modules/content/"
+_DC = "http://purl.org/dc/elements/1.1/"
+_ATOM = "http://www.w3.org/2005/Atom"
+_RSS1 = "http://purl.org/rss/1.0/"
+_RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+_XHTML = "http://www.w3.org/1999/xhtml"
+
+_ROOTS = {"rss", "feed", "RDF"}
+_ENTRIES = {"item", "entry"}
+
+
+class FastFeedError(ValueError):
+    """The document isn't a well-formed RSS/Atom feed; use feedparser instead."""
+
+
+def _split(tag):
+    if tag[0] == "{":
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+def _parse_date(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom) date -> UTC struct_time, like feedparser's *_parsed."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.utctimetuple()
+
+
+def _text(element):
+    return (element.text or "").strip()
+
+
+def _strip_namespaces(element):
+    copy = ET.Element(_split(element.tag)[1], {_split(k)[1]: v for k, v in element.attrib.items()})
+    copy.text, copy.tail = element.text, element.tail
+    copy.extend(_strip_namespaces(child) for child in element)
+    return copy
+
+
+def _markup(element):
+    """
+    Text of a title/summary/content element; for Atom type="xhtml" the inner
+    markup of its wrapping <div>, serialized as HTML like feedparser does.
+    """
+    if element.get("type") != "xhtml":
+        return element.text or ""
+    children = list(element)
+    if len(children) == 1 and _split(children[0].tag) == (_XHTML, "div") and not (element.text or "").strip():
+        element = children[0]
+    return (element.text or "") + "".join(
+        ET.tostring(_strip_namespaces(child), encoding="unicode") for child in element
+    )
+
+
+def _entry(element):
+    """Maps one <item>/<entry> to the feedparser keys the scrapers use."""
+    entry = FeedParserDict()
+    links = []
+    summary = None
+    content = None
+    content_type = "text/html"
+
+    for child in element.iter():
+        if child is element:
+            continue
+        namespace, name = _split(child.tag)
+
+        if namespace in ("", _ATOM, _RSS1):
+            if name == "title" and "title" not in entry:
+                entry["title"] = _markup(child).strip()
+            elif name == "link":
+                href = child.get("href")
+                if href:
+                    link = {"rel": child.get("rel", "alternate"), "type": child.get("type", "text/html"), "href": href}
+                    links.append(link)
+                    if link["rel"] == "alternate" and "link" not in entry:
+                        entry["link"] = href
+                elif _text(child):
+                    entry["link"] = _text(child)
+                    links.append({"rel": "alternate", "type": "text/html", "href": _text(child)})
+            elif name == "enclosure" and child.get("url"):
+                links.append({"rel": "enclosure", "type": child.get("type", ""), "href": child.get("url")})
+            elif name in ("description", "summary") and summary is None:
+                summary = _markup(child)
+            elif name == "content" and content is None:
+                content = _markup(child)
+                content_type = "application/xhtml+xml" if child.get("type") == "xhtml" else "text/html"
+            elif name in ("pubDate", "published"):
+                entry["published"] = _text(child)
+            elif name == "updated":
+                entry["updated"] = _text(child)
+            elif name in ("guid", "id"):
+                entry["id"] = _text(child)
+        elif namespace == _MEDIA:
+            if name == "content" and child.get("url"):
+                entry.setdefault("media_content", []).append(dict(child.attrib))
+            elif name == "thumbnail" and child.get("url"):
+                entry.setdefault("media_thumbnail", []).append(dict(child.attrib))
+            elif name == "description" and summary is None:
+                summary = child.text or ""
+        elif namespace == _YOUTUBE and name == "videoId":
+            entry["yt_videoid"] = _text(child)
+        elif namespace == _CONTENT and name == "encoded":
+            content = child.text or ""
+        elif namespace == _DC and name == "date" and "published" not in entry:
+            entry["published"] = _text(child)
+
+    # RSS 1.0 items are identified by rdf:about
+    if "id" not in entry and element.get(f"{{{_RDF}}}about"):
+        entry["id"] = element.get(f"{{{_RDF}}}about")
+    if links:
+        entry["links"] = links
+        entry.setdefault("link", links[0]["href"])
+    if content is not None:
+        entry["content"] = [{"type": content_type, "value": content}]
+    # feedparser falls back to the content when there is no summary
+    if summary is not None or content is not None:
+        entry["summary"] = summary if summary is not None else content
+    for key in ("published", "updated"):
+        if key in entry:
+            entry[f"{key}_parsed"] = _parse_date(entry[key])
+    return entry
+
+
+class FeedStream:
+    """
+    Incremental parser: feed() it body chunks as they arrive and get back the
+    entries completed so far, so the caller can stop downloading early.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root_seen = False
+
+    def feed(self, data):
+        """Parses a chunk and returns the entries it completed. Raises FastFeedError."""
+        try:
+            self._parser.feed(data)
+            # Syntax errors surface while reading the events
+            return self._entries()
+        except ET.ParseError as e:
+            raise FastFeedError(str(e)) from e
+
+    def close(self):
+        """Ends the document (call after the last chunk). Returns the remaining entries."""
+        try:
+            self._parser.close()
+            entries = self._entries()
+        except ET.ParseError as e:
+            raise FastFeedError(str(e)) from e
+        if not self._root_seen:
+            raise FastFeedError("Documento vazio")
+        return entries
+
+    def _entries(self):
+        entries = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if not self._root_seen:
+                    self._root_seen = True
+                    if _split(element.tag)[1] not in _ROOTS:
+                        raise FastFeedError(f"Raiz inesperada: {element.tag}")
+                continue
+            if _split(element.tag)[1] in _ENTRIES:
+                entries.append(_entry(element))
+                # Entries are independent: drop the parsed subtree to keep memory flat
+                element.clear()
+        return entries
+
+
+def make_feed(entries):
+    """Wraps entries in a FeedParserDict shaped like feedparser's result."""
+    return FeedParserDict(feed=FeedParserDict(), entries=entries, bozo=0)
+
+
+def parse(data, limit=None, chunk_size=64 * 1024):
+    """
+    Parses RSS 2.0 / RSS 1.0 / Atom bytes, keeping only the fields the
+    scrapers read and stopping after `limit` entries. Returns a FeedParserDict
+    shaped like feedparser's result (`entries`, `bozo`).
+    Raises FastFeedError on malformed or unknown documents.
+    """
+    stream = FeedStream()
+    entries = []
+    for offset in range(0, len(data), chunk_size):
+        entries.extend(stream.feed(data[offset:offset + chunk_size]))
+        if limit and len(entries) >= limit:
+            return make_feed(entries[:limit])
+    entries.extend(stream.close())
+    return make_feed(entries[:limit] if limit else entries)
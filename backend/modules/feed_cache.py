@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+from modules.storage import cache_path
+
+# Several scrapers may hold their own instance; saves are serialized and merged
+_save_lock = threading.Lock()
+
+
+class ValidatorCache:
+    """
+    Persists the HTTP validators (ETag / Last-Modified) of every feed URL so the
+    next run can send a conditional GET and skip unchanged feeds on 304.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path("feed_validators.json")
+        self._lock = threading.Lock()
+        self._data = self._load()
+        self._changes = {}
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def request_headers(self, url):
+        """Returns the conditional headers to send for this URL (may be empty)."""
+        with self._lock:
+            entry = self._data.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url, response_headers):
+        """Stores the validators of a 200 response."""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        entry = {"etag": etag, "last_modified": last_modified} if (etag or last_modified) else None
+        with self._lock:
+            if self._data.get(url) != entry:
+                self._changes[url] = entry
+            if entry:
+                self._data[url] = entry
+            else:
+                self._data.pop(url, None)
+
+    def forget(self, url):
+        """
+        Drops the validators of a URL, so its next request is unconditional
+        (used when part of the feed was left unread and must be seen again).
+        """
+        with self._lock:
+            if url in self._data:
+                self._changes[url] = None
+                del self._data[url]
+
+    def save(self):
+        """Merges this instance's changes into the file on disk."""
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        if not changes:
+            return
+
+        with _save_lock:
+            data = self._load()
+            for url, entry in changes.items():
+                if entry:
+                    data[url] = entry
+                else:
+                    data.pop(url, None)
+
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,203 @@
+import time
+import feedparser
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from modules.http_client import default_client
+from modules import fast_feed
+
+# Browser-like User-Agent to avoid blocking by some servers (e.g. Reddit)
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class FetchResult:
+    """Outcome of a single feed download (feed is None when it failed)."""
+
+    def __init__(self, url, feed=None, status=None, error=None, elapsed=0.0, size=0, parse_time=0.0,
+                 truncated=False):
+        self.url = url
+        self.feed = feed
+        self.status = status
+        self.error = error
+        self.elapsed = elapsed
+        # Body size in bytes and feedparser time, for the source telemetry
+        self.size = size
+        self.parse_time = parse_time
+        # The streamed download stopped with accepted entries left past the limit
+        self.truncated = truncated
+
+    @property
+    def ok(self):
+        return self.feed is not None
+
+    @property
+    def not_modified(self):
+        """True when the server answered 304 to our conditional GET."""
+        return self.status == 304
+
+
+class FeedFetcher:
+    """
+    Downloads RSS/Atom feeds in parallel with a bounded thread pool.
+
+    Every request gets a timeout (overridable per host) and a whole sweep is
+    capped by an overall deadline, so one slow host can no longer stall the run.
+    When a ValidatorCache is given, requests are conditional and 304s skip parsing.
+    Connections come from the shared HttpClient pool (keep-alive, retries).
+    """
+
+    def __init__(self, max_workers=8, timeout=10, deadline=60, host_timeouts=None, headers=None, cache=None,
+                 http=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.deadline = deadline
+        # Hosts known to be slow get a bit more room (e.g. {"www.reddit.com": 15})
+        self.host_timeouts = host_timeouts or {}
+        self.headers = headers or {"User-Agent": DEFAULT_USER_AGENT}
+        self.cache = cache
+        self.http = http or default_client()
+
+    def _timeout_for(self, url):
+        host = urlparse(url).netloc.lower()
+        return self.host_timeouts.get(host, self.timeout)
+
+    @staticmethod
+    def _parse(content, parser=None, limit=None):
+        """
+        feedparser by default; parser="fast" uses the iterparse backend (first
+        `limit` entries only) and falls back to feedparser on malformed XML.
+        """
+        if parser == "fast":
+            try:
+                return fast_feed.parse(content, limit=limit)
+            except fast_feed.FastFeedError:
+                pass
+        return feedparser.parse(content)
+
+    def _read_stream(self, response, limit, accept=None, max_entries=None):
+        """
+        Parses the body with the fast backend while it downloads and stops
+        reading once `max_entries` were parsed, or once one entry more than
+        `limit` passed `accept` (all entries count without it): that extra
+        entry shows the caller will leave wanted entries unused. Returns
+        (feed, bytes_read, parse_time, truncated), truncated only in that
+        second case; malformed XML falls back to feedparser over the whole body.
+        """
+        stream = fast_feed.FeedStream()
+        body = bytearray()
+        entries = []
+        accepted = 0
+        parse_time = 0.0
+        chunks = response.iter_content(chunk_size=16 * 1024)
+        try:
+            for chunk in chunks:
+                body.extend(chunk)
+                started = time.monotonic()
+                parsed = stream.feed(chunk)
+                parse_time += time.monotonic() - started
+                for entry in parsed:
+                    entries.append(entry)
+                    if accept is None or accept(entry):
+                        accepted += 1
+                    if accepted > limit or (max_entries and len(entries) >= max_entries):
+                        # Enough entries: the rest of the body is never downloaded
+                        return fast_feed.make_feed(entries), len(body), parse_time, accepted > limit
+            started = time.monotonic()
+            entries.extend(stream.close())
+            return fast_feed.make_feed(entries), len(body), parse_time + time.monotonic() - started, False
+        except fast_feed.FastFeedError:
+            for chunk in chunks:
+                body.extend(chunk)
+            started = time.monotonic()
+            feed = feedparser.parse(bytes(body))
+            return feed, len(body), parse_time + time.monotonic() - started, False
+
+    def fetch(self, url, save_cache=True, parser=None, limit=None, accept=None, max_entries=None):
+        """
+        Downloads and parses a single feed. Never raises.
+
+        With parser="fast" and a `limit`, the body is parsed as it streams in
+        and the download stops right after `limit` entries (only entries for
+        which `accept(entry)` is true count, e.g. the ones not seen yet), or
+        once `max_entries` entries were read. Validators are kept unless
+        accepted entries were left past the limit.
+        """
+        started = time.monotonic()
+        streaming = parser == "fast" and bool(limit)
+        try:
+            headers = dict(self.headers)
+            if self.cache:
+                headers.update(self.cache.request_headers(url))
+
+            response = self.http.get(url, headers=headers, timeout=self._timeout_for(url), stream=streaming)
+            try:
+                if response.status_code == 304:
+                    return FetchResult(url, status=304, elapsed=time.monotonic() - started)
+                if response.status_code != 200:
+                    return FetchResult(url, status=response.status_code,
+                                       error=f"HTTP {response.status_code}",
+                                       elapsed=time.monotonic() - started)
+
+                truncated = False
+                if streaming:
+                    feed, size, parse_time, truncated = self._read_stream(response, limit, accept, max_entries)
+                else:
+                    downloaded = time.monotonic()
+                    feed = self._parse(response.content, parser, limit)
+                    size = len(response.content)
+                    parse_time = time.monotonic() - downloaded
+            finally:
+                # Drops the connection if the body was left unread on purpose
+                response.close()
+
+            if self.cache:
+                if truncated:
+                    # Accepted entries were left past the limit: a 304 next run would hide them for good
+                    self.cache.forget(url)
+                else:
+                    self.cache.update(url, response.headers)
+                if save_cache:
+                    self.cache.save()
+            return FetchResult(url, feed=feed, status=response.status_code,
+                               elapsed=time.monotonic() - started, size=size,
+                               parse_time=parse_time, truncated=truncated)
+        except Exception as e:
+            return FetchResult(url, error=str(e), elapsed=time.monotonic() - started)
+
+    def forget(self, url):
+        """
+        Called by scrapers that left entries of a fetched feed unused: its
+        validators are dropped so the next run reads the whole feed again
+        instead of getting a 304 and never seeing those entries.
+        """
+        if self.cache:
+            self.cache.forget(url)
+            self.cache.save()
+
+    def fetch_all(self, urls, options=None):
+        """
+        Fetches all URLs concurrently and returns a dict {url: FetchResult}.
+        Feeds still running when the deadline expires are reported as timed out.
+        `options` maps a URL to extra fetch() arguments, e.g. {"parser": "fast", "limit": 2, "accept": is_new}.
+        """
+        options = options or {}
+        urls = list(dict.fromkeys(urls))  # Drop repeated URLs, keep order
+        results = {}
+        if not urls:
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)))
+        futures = {executor.submit(self.fetch, url, False, **options.get(url, {})): url for url in urls}
+        done, not_done = wait(futures, timeout=self.deadline)
+
+        for future in done:
+            results[futures[future]] = future.result()
+        for future in not_done:
+            future.cancel()
+            url = futures[future]
+            results[url] = FetchResult(url, error=f"Prazo global de {self.deadline}s excedido")
+
+        # Don't block on stragglers: each one is bounded by its own request timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache:
+            self.cache.save()
+        return results
@@ -0,0 +1,98 @@
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401 -- lets urllib3 decode "br" responses
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Statuses retried with backoff (Retry-After is honoured on 429/503)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _JitterRetry(Retry):
+    """Retry with "full jitter" backoff and a cap on the server's Retry-After."""
+
+    max_retry_after = 30
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff else 0
+
+    def new(self, **kwargs):
+        # urllib3 rebuilds the Retry after every attempt; keep the cap
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client shared by the scrapers.
+
+    One HTTPAdapter (urllib3 pool per host, at most `per_host` connections,
+    callers wait for a free one) is mounted on a session per thread, so
+    sessions don't share cookie state across threads but every thread reuses
+    the same TCP/TLS connections. Idempotent requests are retried on
+    connection errors and on 429/5xx with exponential backoff plus jitter.
+    """
+
+    def __init__(self, per_host=4, max_hosts=64, retries=3, backoff_factor=0.5, max_retry_after=30):
+        retry = _JitterRetry(
+            total=retries,
+            # A read timeout already cost a full timeout: retry it only once
+            read=1,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            # Callers inspect the final status themselves
+            raise_on_status=False,
+        )
+        retry.max_retry_after = max_retry_after
+        self.adapter = HTTPAdapter(
+            pool_connections=max_hosts,
+            pool_maxsize=per_host,
+            pool_block=True,
+            max_retries=retry,
+        )
+        self._local = threading.local()
+
+    def session(self):
+        """Returns this thread's session (created on first use)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session().get(url, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """The process-wide HttpClient (one connection pool for every scraper)."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
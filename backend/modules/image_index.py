@@ -0,0 +1,81 @@
+import time
+from contextlib import closing
+from PIL import Image
+from modules.storage import connect
+
+
+def dhash(image, size=8):
+    """64-bit difference hash: survives re-encoding, resizing and small edits."""
+    gray = image.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class ImageHashIndex:
+    """
+    Remembers every source image already copied to our bucket, by source URL,
+    exact content hash and perceptual hash, so the same picture is stored once.
+    """
+
+    def __init__(self, db_name="image_index.sqlite3", max_distance=4):
+        self.db_name = db_name
+        # Max Hamming distance between dHashes to treat two images as the same picture
+        self.max_distance = max_distance
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " sha256 TEXT PRIMARY KEY, dhash INTEGER, public_url TEXT NOT NULL, created_at REAL"
+                ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources (source_url TEXT PRIMARY KEY, sha256 TEXT)"
+            )
+
+    def by_source(self, source_url):
+        with closing(connect(self.db_name)) as conn:
+            row = conn.execute(
+                "SELECT i.public_url FROM sources s JOIN images i ON i.sha256 = s.sha256"
+                " WHERE s.source_url = ?", (source_url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def find(self, sha256, phash):
+        """Returns (sha256, public_url) of an identical or near-identical image, or None."""
+        with closing(connect(self.db_name)) as conn:
+            row = conn.execute(
+                "SELECT sha256, public_url FROM images WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            if row:
+                return row
+            if phash is None:
+                return None
+            # SQLite stores signed 64-bit integers; compare on the unsigned value
+            for other_sha, other_hash, url in conn.execute("SELECT sha256, dhash, public_url FROM images"):
+                if other_hash is not None and bin((other_hash & (2**64 - 1)) ^ phash).count("1") <= self.max_distance:
+                    return other_sha, url
+        return None
+
+    def add(self, source_url, sha256, phash, public_url):
+        signed = phash - 2**64 if phash is not None and phash >= 2**63 else phash
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO images (sha256, dhash, public_url, created_at) VALUES (?, ?, ?, ?)",
+                (sha256, signed, public_url, time.time())
+            )
+            self.link(source_url, sha256, conn)
+
+    def link(self, source_url, sha256, conn=None):
+        """Points another source URL at an image already stored."""
+        if conn is None:
+            with closing(connect(self.db_name)) as conn, conn:
+                self.link(source_url, sha256, conn)
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO sources (source_url, sha256) VALUES (?, ?)", (source_url, sha256)
+        )
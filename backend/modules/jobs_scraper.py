@@ -1,16 +1,21 @@
-import requests
 import datetime
 import random
 import re
-import feedparser
 from dateutil import parser as date_parser
 import time
+from modules.fetcher import FeedFetcher
+from modules.feed_cache import ValidatorCache
+from modules.dedup_index import as_lookup
+from modules.tagging import JOB_TAGGER
+from modules.telemetry import SourceTelemetry
 
 class JobScraper:
-    def __init__(self):
+    def __init__(self, fetcher=None, telemetry=None):
+        self.telemetry = telemetry or SourceTelemetry("jobs")
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.fetcher = fetcher or FeedFetcher(headers=self.headers, cache=ValidatorCache())
         
         # RSS/Atom Feeds to scrape
         self.rss_sources = [
@@ -43,43 +48,80 @@ class JobScraper:
         all_jobs = []
         
         # 1. Fetch from RemoteOK API (JSON)
-        print("🌍 Buscando RemoteOK...")
-        all_jobs.extend(self._fetch_remoteok(limit=5))
+        if self._enabled("RemoteOK"):
+            print("🌍 Buscando RemoteOK...")
+            all_jobs.extend(self._fetch_remoteok(limit=5))
         
         # 2. Fetch from Howdy Latam (HTML Scraping)
-        print("🌎 Buscando Howdy Latam...")
-        all_jobs.extend(self._fetch_howdy_latam(limit=10))
+        if self._enabled("Howdy Latam"):
+            print("🌎 Buscando Howdy Latam...")
+            all_jobs.extend(self._fetch_howdy_latam(limit=10))
         
         # 3. Fetch from RSS Feeds
+        feed_of = {}
         for source in self.rss_sources:
+            if not self._enabled(source['name']):
+                continue
             print(f"📡 Buscando {source['name']} RSS...")
             feed_jobs = self._fetch_rss(source, limit=5)
             all_jobs.extend(feed_jobs)
+            feed_of.update((job['apply_url'], source['url']) for job in feed_jobs)
+
+        self.telemetry.flush()
             
         # Deduplication
         unique_jobs = []
-        seen_urls = set(existing_urls)
+        seen_urls = as_lookup(existing_urls)
+        # Repeats within this batch: the lookup may be the shared index view, which
+        # must only learn URLs that were actually saved
+        batch_urls = set()
         
         for job in all_jobs:
-            if job['apply_url'] not in seen_urls:
+            if job['apply_url'] not in seen_urls and job['apply_url'] not in batch_urls:
                 unique_jobs.append(job)
-                seen_urls.add(job['apply_url'])
+                batch_urls.add(job['apply_url'])
                 
         # Sort by date (newest first)
         unique_jobs.sort(key=lambda x: x['created_at'], reverse=True)
         
         print(f"✅ Total processado: {len(unique_jobs)} vagas novas.")
+        # Jobs cut here are not saved: their feeds must be read in full next run, not answered with a 304
+        for url in {feed_of.get(job['apply_url']) for job in unique_jobs[limit:]} - {None}:
+            self.fetcher.forget(url)
         return unique_jobs[:limit]
 
+    def _enabled(self, name):
+        if self.telemetry.is_disabled(name):
+            print(f"   🚫 Fonte desativada temporariamente (falhas seguidas): {name}")
+            self.telemetry.record(name, status="disabled")
+            return False
+        return True
+
+    def _get(self, name, url, timeout):
+        """GET through the shared HTTP pool for the non-RSS sources, timed for the telemetry. Returns (response, elapsed)."""
+        started = time.monotonic()
+        try:
+            response = self.fetcher.http.get(url, headers=self.headers, timeout=timeout)
+        except Exception as e:
+            self.telemetry.record(name, url=url, status="error", elapsed=time.monotonic() - started, error=str(e))
+            raise
+        elapsed = time.monotonic() - started
+        if response.status_code != 200:
+            self.telemetry.record(name, url=url, status="error", http_status=response.status_code,
+                                  elapsed=elapsed, error=f"HTTP {response.status_code}")
+        return response, elapsed
+
     def _fetch_remoteok(self, limit=5):
         try:
             url = "https://remoteok.com/api?tag=dev"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response, elapsed = self._get("RemoteOK", url, timeout=10)
             if response.status_code != 200:
                 print(f"   ⚠️ RemoteOK falhou: {response.status_code}")
                 return []
                 
+            parse_started = time.monotonic()
             data = response.json()
+            parse_time = time.monotonic() - parse_started
             jobs = []
             count = 0
             
@@ -98,6 +140,9 @@ class JobScraper:
                 }
                 jobs.append(job)
                 count += 1
+            self.telemetry.record("RemoteOK", url=url, http_status=response.status_code, elapsed=elapsed,
+                                  size=len(response.content), parse_time=parse_time,
+                                  entries=len(data), yielded=len(jobs))
             return jobs
         except Exception as e:
             print(f"   ❌ Erro RemoteOK: {e}")
@@ -105,13 +150,18 @@ class JobScraper:
 
     def _fetch_rss(self, source, limit=5):
         try:
-            # Fetch with requests to ensure timeout and headers
-            response = requests.get(source['url'], headers=self.headers, timeout=10)
-            if response.status_code != 200:
-                print(f"   ⚠️ Falha ao acessar feed {source['name']}: {response.status_code}")
+            # Conditional GET with timeout and headers (304 = nothing new since last run)
+            result = self.fetcher.fetch(source['url'], parser=source.get('parser'), limit=limit)
+            if result.not_modified or not result.ok:
+                self.telemetry.record_fetch(source['name'], result)
+            if result.not_modified:
+                print(f"   💤 Sem vagas novas (304): {source['name']}")
+                return []
+            if not result.ok:
+                print(f"   ⚠️ Falha ao acessar feed {source['name']}: {result.error}")
                 return []
                 
-            feed = feedparser.parse(response.content)
+            feed = result.feed
             jobs = []
             count = 0
             
@@ -155,6 +205,7 @@ class JobScraper:
                 jobs.append(job)
                 count += 1
                 
+            self.telemetry.record_fetch(source['name'], result, entries=len(feed.entries), yielded=len(jobs))
             return jobs
         except Exception as e:
             print(f"   ❌ Erro {source['name']}: {e}")
@@ -164,11 +215,12 @@ class JobScraper:
         """Scrapes job listings from Howdy Latam opportunities page."""
         try:
             url = "https://www.howdylatam.com/oportunidades"
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response, elapsed = self._get("Howdy Latam", url, timeout=15)
             if response.status_code != 200:
                 print(f"   ⚠️ Howdy Latam falhou: {response.status_code}")
                 return []
 
+            parse_started = time.monotonic()
             html = response.text
             # Extract all job links: /oportunidades/{slug}
             raw_links = re.findall(
@@ -204,6 +256,9 @@ class JobScraper:
                 }
                 jobs.append(job)
 
+            self.telemetry.record("Howdy Latam", url=url, http_status=response.status_code, elapsed=elapsed,
+                                  size=len(response.content), parse_time=time.monotonic() - parse_started,
+                                  entries=len(slugs), yielded=len(jobs))
             return jobs
         except Exception as e:
             print(f"   ❌ Erro Howdy Latam: {e}")
@@ -235,31 +290,7 @@ class JobScraper:
 
     def _infer_tags(self, title):
         """Infers technology tags from a job title."""
-        tag_map = {
-            'golang': 'Go', 'go ': 'Go', 'python': 'Python',
-            'node': 'Node.js', 'nodejs': 'Node.js',
-            'react': 'React', 'reactjs': 'React',
-            'vue': 'Vue.js', 'angular': 'Angular',
-            'java': 'Java', 'kotlin': 'Kotlin',
-            'devops': 'DevOps', 'sre': 'DevOps',
-            'data': 'Data', 'machine learning': 'ML',
-            'fullstack': 'Full Stack', 'full stack': 'Full Stack',
-            'frontend': 'Frontend', 'front end': 'Frontend',
-            'backend': 'Backend', 'back end': 'Backend',
-            'qa': 'QA', 'quality': 'QA', 'testing': 'QA',
-            'ios': 'iOS', 'swift': 'iOS',
-            'android': 'Android',
-            'aws': 'AWS', 'cloud': 'Cloud',
-            'typescript': 'TypeScript',
-        }
-        title_lower = title.lower()
-        tags = []
-        seen = set()
-        for keyword, tag in tag_map.items():
-            if keyword in title_lower and tag not in seen:
-                tags.append(tag)
-                seen.add(tag)
-        return tags if tags else ['Tech']
+        return JOB_TAGGER.classify(title) or ['Tech']
 
     def _format_salary(self, min_sal, max_sal):
         if not min_sal or not max_sal:
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import time
+from contextlib import closing
+from modules.storage import connect
+
+
+class LLMCache:
+    """
+    Content-addressed cache of chat completions.
+
+    Entries are keyed by a hash of everything that shapes the answer (model,
+    prompts, temperature) and hold both the raw completion and the parsed JSON,
+    so a rerun after a crash reuses the paid completion instead of calling the
+    API again. Old entries expire after `ttl` seconds and the least recently
+    used ones are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, db_name="llm_cache.sqlite3", ttl=7 * 24 * 3600, max_entries=500):
+        self.db_name = db_name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, model TEXT, raw TEXT, parsed TEXT,"
+                " created_at REAL, accessed_at REAL"
+                ")"
+            )
+
+    @staticmethod
+    def key(model, system_prompt, user_prompt, temperature):
+        payload = json.dumps([model, system_prompt, user_prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns (raw, parsed) for a fresh entry, or None."""
+        now = time.time()
+        with closing(connect(self.db_name)) as conn, conn:
+            row = conn.execute(
+                "SELECT raw, parsed, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            raw, parsed, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+        return raw, json.loads(parsed)
+
+    def put(self, key, model, raw, parsed):
+        now = time.time()
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, raw, parsed, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, raw, json.dumps(parsed, ensure_ascii=False), now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        if self.ttl:
+            conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl,))
+        if self.max_entries:
+            conn.execute(
+                "DELETE FROM completions WHERE key NOT IN ("
+                " SELECT key FROM completions ORDER BY accessed_at DESC LIMIT ?"
+                ")",
+                (self.max_entries,)
+            )
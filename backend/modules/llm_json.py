@@ -0,0 +1,12 @@
+import json_repair
+
+
+def parse_completion(content_raw):
+    """
+    JSON object from a model completion: strips a ```json fence the model may
+    add despite the instructions and repairs broken JSON (trailing commas,
+    truncated output). Kept free of config so the benchmarks run the same code.
+    """
+    if content_raw.startswith("```json"):
+        content_raw = content_raw.replace("```json", "").replace("```", "")
+    return json_repair.loads(content_raw)
@@ -0,0 +1,154 @@
+import datetime
+import threading
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """The subset of the postgrest query builder the pipelines use."""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.columns = None
+        self.filters = []
+        self.ordering = []
+        self.window = None
+        self.action = None
+
+    def select(self, columns="*"):
+        self.action = ("select", None)
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, count):
+        self.window = (0, count)
+        return self
+
+    def insert(self, rows):
+        self.action = ("insert", (rows, None))
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        if not ignore_duplicates:
+            raise NotImplementedError("LocalSupabase só suporta upsert com ignore_duplicates=True")
+        self.action = ("insert", (rows, on_conflict))
+        return self
+
+    def execute(self):
+        kind, args = self.action
+        if kind == "insert":
+            return _Response(self.db._insert(self.table, *args))
+
+        rows = [row for row in self.db._rows(self.table) if all(f(row) for f in self.filters)]
+        for column, desc in reversed(self.ordering):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self.window:
+            rows = rows[self.window[0]:self.window[1]]
+        if self.columns:
+            rows = [{c: row.get(c) for c in self.columns} for row in rows]
+        return _Response([dict(row) for row in rows])
+
+
+class _Bucket:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def upload(self, path, file, file_options=None):
+        with self.db._lock:
+            self.db.files[(self.name, path)] = bytes(file)
+        return {"Key": f"{self.name}/{path}"}
+
+    def list(self, path=None, options=None):
+        search = (options or {}).get("search", "")
+        with self.db._lock:
+            return [{"name": name} for bucket, name in self.db.files if bucket == self.name and search in name]
+
+    def remove(self, paths):
+        with self.db._lock:
+            for path in paths:
+                self.db.files.pop((self.name, path), None)
+        return [{"name": path} for path in paths]
+
+    def get_public_url(self, path):
+        return f"{self.db.url}/storage/v1/object/public/{self.name}/{path}"
+
+
+class _Storage:
+    def __init__(self, db):
+        self.db = db
+
+    def from_(self, bucket):
+        return _Bucket(self.db, bucket)
+
+
+class LocalSupabase:
+    """
+    In-memory stand-in for the Supabase client (tables + Storage) used by
+    dry runs and fixture replays: nothing is written to the real project.
+
+    Tables can be seeded with a snapshot of the real rows, so the dedup index
+    sees the same history. Inserts get an `id` and `created_at` like the
+    database defaults, and upserts skip rows whose conflict column exists.
+    """
+
+    url = "https://local.supabase"
+
+    def __init__(self, tables=None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.files = {}
+        # Rows inserted per table since the stand-in was created
+        self.inserted = {}
+        self.storage = _Storage(self)
+        self._lock = threading.Lock()
+        self._ids = {name: max((row.get("id") or 0 for row in rows), default=0)
+                     for name, rows in self.tables.items()}
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def _rows(self, table):
+        with self._lock:
+            return list(self.tables.get(table, []))
+
+    def _insert(self, table, rows, on_conflict):
+        inserted = []
+        with self._lock:
+            existing = self.tables.setdefault(table, [])
+            keys = {row.get(on_conflict) for row in existing} if on_conflict else set()
+            for row in rows:
+                if on_conflict and row.get(on_conflict) in keys:
+                    continue
+                self._ids[table] = self._ids.get(table, 0) + 1
+                row = {"id": self._ids[table], "created_at": datetime.datetime.now().isoformat(), **row}
+                existing.append(row)
+                inserted.append(dict(row))
+                self.inserted[table] = self.inserted.get(table, 0) + 1
+                if on_conflict:
+                    keys.add(row.get(on_conflict))
+        return inserted
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+def run_concurrently(pipelines, timeout=None, deadline=None):
+    """
+    Runs the pipelines (dict name -> callable returning a summary dict) at the
+    same time and returns {name: summary}, each with `status` and `elapsed`.
+
+    A pipeline is abandoned after `timeout` seconds (a number, or a dict with
+    one value per pipeline), and the whole call returns after `deadline`
+    seconds at most. Pipelines run on daemon threads, so one that is stuck
+    can't keep the process alive once the caller exits.
+    """
+    started = time.monotonic()
+    results = {}
+    threads = {}
+
+    def runner(name, func):
+        begin = time.monotonic()
+        try:
+            summary = dict(func() or {})
+            summary["status"] = "error" if summary.get("error") else "ok"
+        except Exception as e:
+            summary = {"status": "error", "error": str(e)}
+        summary["elapsed"] = round(time.monotonic() - begin, 1)
+        results[name] = summary
+
+    for name, func in pipelines.items():
+        thread = threading.Thread(target=runner, args=(name, func), name=f"pipeline-{name}", daemon=True)
+        thread.start()
+        threads[name] = thread
+
+    timeouts = timeout if isinstance(timeout, dict) else {name: timeout for name in pipelines}
+    limits = {}
+    for name, thread in threads.items():
+        candidates = [limit for limit in (timeouts.get(name), deadline) if limit]
+        limits[name] = min(candidates) if candidates else None
+        if limits[name]:
+            thread.join(max(0, started + limits[name] - time.monotonic()))
+        else:
+            thread.join()
+
+    summaries = {}
+    for name in pipelines:
+        summary = results.get(name)
+        if summary is None:
+            # Still running: report it now, whatever it does later is ignored
+            reason = "Prazo global" if limits[name] == deadline else "Tempo limite"
+            summary = {"status": "timeout", "error": f"{reason} de {limits[name]:g}s excedido",
+                       "elapsed": round(time.monotonic() - started, 1)}
+        summaries[name] = summary
+    return summaries
+
+
+def print_summary(summaries, elapsed):
+    """Prints one line per pipeline plus the total wall-clock time."""
+    icons = {"ok": "✅", "error": "❌", "timeout": "⏱️"}
+    print("\n📋 Resumo da execução:")
+    for name, summary in summaries.items():
+        details = ", ".join(
+            f"{key}={value}" for key, value in summary.items() if key not in ("status", "elapsed", "error")
+        )
+        line = f"   {icons.get(summary['status'], '•')} {name}: {summary['status']} em {summary['elapsed']}s"
+        if details:
+            line += f" ({details})"
+        if summary.get("error"):
+            line += f" — {summary['error']}"
+        print(line)
+    print(f"   ⏱️ Tempo total: {elapsed:.1f}s")
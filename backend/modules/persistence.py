@@ -0,0 +1,100 @@
+import datetime
+from postgrest.exceptions import APIError
+
+# Column that identifies a row of each table (needs a unique index in Supabase)
+CONFLICT_COLUMNS = {"posts": "slug", "jobs": "apply_url", "videos": "url"}
+
+# Postgres error when ON CONFLICT names a column without a unique index
+_NO_UNIQUE_CONSTRAINT = "42P10"
+
+
+class MissingUniqueIndex(RuntimeError):
+    """The conflict column has no unique index, so the database can't skip duplicates."""
+
+
+def post_row(article_data):
+    """Row of the posts table for a generated article (with its image_url attached)."""
+    return {
+        "title": article_data['title'],
+        "slug": article_data['slug'],
+        "content": article_data['content'],
+        "excerpt": article_data['excerpt'],
+        "image_url": article_data['image_url'],
+        "tags": article_data['tags'],
+        "type": article_data['type'],
+        "original_url": article_data.get('original_url'), # Save Source Link
+        "created_at": datetime.datetime.now().isoformat()
+    }
+
+
+def video_row(video):
+    """Row of the videos table for a scraped video."""
+    return {
+        "title": video['title'],
+        "thumbnail": video['thumbnail'],
+        "url": video['url'],
+        "channel": video['author'],
+        "views": 0,
+        "duration": video['duration'],
+        "published_at": video['published_at'],
+        "tags": video.get('tags', ["Tech", "Video"])
+    }
+
+
+class WriteResult:
+    """Outcome of a bulk write: the rows Supabase actually inserted and how many were skipped."""
+
+    def __init__(self):
+        self.inserted = []
+        self.skipped = 0
+
+    def __repr__(self):
+        return f"WriteResult(inserted={len(self.inserted)}, skipped={self.skipped})"
+
+
+class BulkWriter:
+    """
+    Saves rows with chunked `upsert(..., on_conflict=<column>, ignore_duplicates=True)`.
+
+    Rows whose key already exists (or repeats inside the batch) are skipped by
+    the database itself, so there is no select round trip before inserting
+    and concurrent runs can't create duplicates. Requires a unique index on
+    the conflict column (backend/sql/unique_keys.sql); without one nothing is
+    written and MissingUniqueIndex is raised.
+    """
+
+    def __init__(self, supabase, chunk_size=500):
+        self.supabase = supabase
+        self.chunk_size = chunk_size
+
+    def write(self, table, rows):
+        """Inserts the new rows of `table`. Returns a WriteResult."""
+        column = CONFLICT_COLUMNS[table]
+        result = WriteResult()
+
+        unique = {}
+        for row in rows:
+            unique.setdefault(row[column], row)
+        result.skipped += len(rows) - len(unique)
+        unique = list(unique.values())
+
+        for start in range(0, len(unique), self.chunk_size):
+            chunk = unique[start:start + self.chunk_size]
+            inserted = self._upsert(table, column, chunk).data or []
+            result.inserted.extend(inserted)
+            result.skipped += len(chunk) - len(inserted)
+        return result
+
+    def _upsert(self, table, column, chunk):
+        try:
+            return self.supabase.table(table).upsert(
+                chunk, on_conflict=column, ignore_duplicates=True
+            ).execute()
+        except APIError as e:
+            if e.code != _NO_UNIQUE_CONSTRAINT:
+                raise
+            # A plain insert would duplicate rows: refuse until the index exists
+            raise MissingUniqueIndex(
+                f"{table}.{column} sem índice único; nada foi gravado. "
+                f"Crie com: create unique index on {table} ({column}); (veja backend/sql/unique_keys.sql)"
+            ) from e
@@ -0,0 +1,28 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_minute` tokens refill continuously and
+    at most `burst` can be spent at once. acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,264 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+import requests
+from google.genai import types
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from modules.local_supabase import LocalSupabase
+
+# Tables snapshotted when recording, with the columns the pipelines read back
+SNAPSHOT_COLUMNS = {
+    "posts": "id, slug, original_url, created_at",
+    "jobs": "id, apply_url, created_at",
+    "videos": "id, url, created_at",
+}
+
+# The body is stored decoded, so these no longer describe it
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class FixtureMissing(LookupError):
+    """The replayed run made a call that wasn't recorded."""
+
+
+class FixtureArchive:
+    """
+    Zip of upstream responses for offline runs of the pipeline.
+
+    In "record" mode the real HTTP feeds, OpenAI and Gemini are called and
+    every response is captured; Supabase is snapshotted once and replaced by
+    a LocalSupabase, so a recording is also a dry run. In "replay" mode the
+    same calls are answered from the archive, with no network and no keys.
+
+    Calls are keyed by their request (method + URL, or the SDK arguments);
+    repeated calls with the same key are answered in the recorded order.
+
+    `clock` is the time the recording started, stored in the manifest: code
+    whose decisions depend on "now" (candidate ranking) uses it in both
+    modes, so a replay days later still picks the recorded calls.
+    """
+
+    def __init__(self, path, mode):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Modo de fixtures inválido: {mode}")
+        self.path = path
+        self.mode = mode
+        self._entries = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.clock = time.time()
+        if mode == "replay":
+            with zipfile.ZipFile(path) as archive:
+                self._entries = {name: archive.read(name) for name in archive.namelist()}
+            self.clock = json.loads(self._entries.get("manifest.json") or "{}").get("clock")
+            print(f"📼 Reproduzindo fixtures de {path} ({len(self._entries)} arquivos, sem rede).")
+            if self.clock is None:
+                print("   ⚠️ Gravação sem horário de referência: o ranking usa o horário atual.")
+        else:
+            print(f"⏺️ Gravando fixtures em {path} (Supabase substituído por um banco local).")
+
+    def _name(self, kind, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+        with self._lock:
+            n = self._counters.get((kind, digest), 0)
+            self._counters[(kind, digest)] = n + 1
+        return f"{kind}/{digest}", n
+
+    def put(self, kind, key, meta, body=None):
+        prefix, n = self._name(kind, key)
+        with self._lock:
+            self._entries[f"{prefix}/{n}.json"] = json.dumps(dict(meta, key=key), ensure_ascii=False).encode("utf-8")
+            if body is not None:
+                self._entries[f"{prefix}/{n}.body"] = body
+
+    def get(self, kind, key):
+        """Returns (meta, body) of the next recorded answer for `key`. Raises FixtureMissing."""
+        prefix, n = self._name(kind, key)
+        # Called more often than when recording: keep answering with the last response
+        while n > 0 and f"{prefix}/{n}.json" not in self._entries:
+            n -= 1
+        meta = self._entries.get(f"{prefix}/{n}.json")
+        if meta is None:
+            raise FixtureMissing(f"Sem fixture para {kind}: {key[:120]}")
+        return json.loads(meta), self._entries.get(f"{prefix}/{n}.body")
+
+    def save(self):
+        """Writes the recording (no-op when replaying)."""
+        if self.mode != "record":
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        manifest = {"recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "clock": self.clock,
+                    "entries": len(self._entries)}
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("manifest.json", json.dumps(manifest))
+            for name, data in sorted(self._entries.items()):
+                archive.writestr(name, data)
+        print(f"💾 Fixtures gravadas: {self.path} ({len(self._entries)} arquivos).")
+
+    # --- Upstream wrappers ---
+
+    def http_adapter(self, adapter):
+        return _FixtureAdapter(self, adapter)
+
+    def openai(self, client=None):
+        # Recording without a key: leave the client as it is (the call fails like in a live run)
+        if self.mode == "record" and client is None:
+            return None
+        return _FixtureOpenAI(self, client)
+
+    def gemini(self, client=None):
+        if self.mode == "record" and client is None:
+            return None
+        return _FixtureGemini(self, client)
+
+    def supabase(self, client=None):
+        """LocalSupabase seeded with the real tables (recorded) or with the recorded snapshot (replay)."""
+        tables = {}
+        for table, columns in SNAPSHOT_COLUMNS.items():
+            if self.mode == "record":
+                rows = []
+                while True:
+                    page = client.table(table).select(columns).order("id").range(len(rows), len(rows) + 999).execute()
+                    rows.extend(page.data)
+                    if len(page.data) < 1000:
+                        break
+                self.put("supabase", table, {"rows": rows})
+            else:
+                rows = self.get("supabase", table)[0]["rows"]
+            tables[table] = rows
+        return LocalSupabase(tables)
+
+
+class _FixtureAdapter(BaseAdapter):
+    """Transport adapter that records/replays every response of the shared HTTP client."""
+
+    def __init__(self, archive, adapter):
+        super().__init__()
+        self.archive = archive
+        self.adapter = adapter
+
+    def _key(self, request):
+        key = f"{request.method} {request.url}"
+        if request.body:
+            body = request.body if isinstance(request.body, bytes) else str(request.body).encode("utf-8")
+            key += f" {hashlib.sha256(body).hexdigest()}"
+        return key
+
+    def send(self, request, **kwargs):
+        key = self._key(request)
+        if self.archive.mode == "record":
+            response = self.adapter.send(request, **kwargs)
+            body = response.content
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+            self.archive.put("http", key, {
+                "url": response.url, "status": response.status_code, "reason": response.reason,
+                "headers": headers, "encoding": response.encoding,
+            }, body)
+            return response
+
+        try:
+            meta, body = self.archive.get("http", key)
+        except FixtureMissing as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request)
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.reason = meta["reason"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = meta["encoding"]
+        response.url = meta["url"]
+        response.request = request
+        response.connection = self
+        response.raw = io.BytesIO(body or b"")
+        # Already "downloaded": iter_content() slices the stored body
+        response._content = body or b""
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+def _key(kwargs):
+    return json.dumps(kwargs, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class _RecordedStream:
+    """Passes a completion stream through, keeping the chunks that were read."""
+
+    def __init__(self, archive, key, stream):
+        self.archive = archive
+        self.key = key
+        self.stream = stream
+        self.chunks = []
+        self.saved = False
+
+    def __iter__(self):
+        for chunk in self.stream:
+            self.chunks.append(chunk.model_dump(mode="json"))
+            yield chunk
+
+    def close(self):
+        self.stream.close()
+        # A stream closed early (header hook) is stored as far as it was read
+        if not self.saved:
+            self.saved = True
+            self.archive.put("openai", self.key, {"chunks": self.chunks})
+
+
+class _ReplayStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield ChatCompletionChunk.model_validate(chunk)
+
+    def close(self):
+        pass
+
+
+class _FixtureOpenAI:
+    """Stands in for OpenAI(): only `chat.completions.create` is recorded/replayed."""
+
+    def __init__(self, archive, client):
+        self.archive = archive
+        self.client = client
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        key = _key(kwargs)
+        if self.archive.mode == "record":
+            response = self.client.chat.completions.create(**kwargs)
+            if kwargs.get("stream"):
+                return _RecordedStream(self.archive, key, response)
+            self.archive.put("openai", key, {"completion": response.model_dump(mode="json")})
+            return response
+
+        meta = self.archive.get("openai", key)[0]
+        if "chunks" in meta:
+            return _ReplayStream(meta["chunks"])
+        return ChatCompletion.model_validate(meta["completion"])
+
+
+class _FixtureGemini:
+    """Stands in for genai.Client(): only `models.generate_content` is recorded/replayed."""
+
+    def __init__(self, archive, client):
+        self.archive = archive
+        self.client = client
+        self.models = self
+
+    def generate_content(self, **kwargs):
+        key = _key(kwargs)
+        if self.archive.mode == "record":
+            response = self.client.models.generate_content(**kwargs)
+            self.archive.put("gemini", key, {}, response.model_dump_json(exclude_none=True).encode("utf-8"))
+            return response
+        return types.GenerateContentResponse.model_validate_json(self.archive.get("gemini", key)[1])
@@ -0,0 +1,126 @@
+import calendar
+import statistics
+import time
+from contextlib import closing
+import config
+from modules.storage import connect
+
+# Poll twice per observed posting gap, so a new entry waits at most ~half a gap
+_POLLS_PER_GAP = 2
+# How much of the estimate each new observation replaces
+_SMOOTHING = 0.5
+# Multipliers used when the feed has no usable timestamps
+_BACKOFF = 1.5
+_SPEEDUP = 0.75
+
+
+def _entry_timestamp(entry):
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return calendar.timegm(parsed) if parsed else None
+
+
+class FeedScheduler:
+    """
+    Learns how often each feed publishes and only lets the due ones be fetched.
+
+    The posting gap is estimated from the entry timestamps of every fetch
+    (median gap between consecutive entries, smoothed across runs). Feeds
+    without dates fall back to the fetch history: the interval shrinks when
+    the newest entry changed and grows on 304s / unchanged feeds.
+    """
+
+    def __init__(self, db_name="feed_schedule.sqlite3", min_interval=None, max_interval=None, max_per_run=None):
+        self.db_name = db_name
+        self.min_interval = (min_interval or config.SCHEDULER_MIN_MINUTES * 60)
+        self.max_interval = (max_interval or config.SCHEDULER_MAX_HOURS * 3600)
+        self.max_per_run = config.SCHEDULER_MAX_PER_RUN if max_per_run is None else max_per_run
+
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS feeds ("
+                " url TEXT PRIMARY KEY, gap REAL, interval REAL, next_poll REAL,"
+                " last_poll REAL, newest_entry TEXT, polls INTEGER DEFAULT 0"
+                ")"
+            )
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def due(self, sources, now=None):
+        """
+        Returns the sources (dicts with 'url') due for a poll, most overdue
+        first and capped at `max_per_run`; feeds never seen are always due.
+        Feeds due within `min_interval` count as due, so a fixed cron
+        schedule doesn't miss them by a few minutes of drift.
+        """
+        now = now or time.time()
+        with closing(connect(self.db_name)) as conn:
+            schedule = {
+                url: (next_poll, interval)
+                for url, next_poll, interval in conn.execute("SELECT url, next_poll, interval FROM feeds")
+            }
+
+        ranked = []
+        for position, source in enumerate(sources):
+            next_poll, interval = schedule.get(source['url'], (None, None))
+            if next_poll is None:
+                overdue = float("inf")
+            elif next_poll - self.min_interval <= now:
+                overdue = (now - next_poll) / (interval or self.min_interval)
+            else:
+                continue
+            ranked.append((-overdue, position, source))
+
+        ranked.sort(key=lambda item: item[:2])
+        if self.max_per_run:
+            ranked = ranked[:self.max_per_run]
+        # Keep the configured order among the selected feeds
+        return [source for _, _, source in sorted(ranked, key=lambda item: item[1])]
+
+    def observe(self, url, result, now=None):
+        """Updates the cadence of a feed from a FetchResult and schedules its next poll."""
+        now = now or time.time()
+        with closing(connect(self.db_name)) as conn, conn:
+            row = conn.execute(
+                "SELECT gap, interval, newest_entry, polls FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+            gap, interval, newest_entry, polls = row or (None, None, None, 0)
+
+            if not result.ok and not result.not_modified:
+                # Failures are retried soon; chronic ones are handled by the telemetry
+                interval = interval or self.min_interval
+                next_poll = now + self.min_interval
+            else:
+                entries = result.feed.entries if result.ok else []
+                newest = (entries[0].get('link') or entries[0].get('id')) if entries else newest_entry
+                observed_gap = self._observed_gap(entries)
+
+                if observed_gap is not None:
+                    gap = observed_gap if gap is None else (1 - _SMOOTHING) * gap + _SMOOTHING * observed_gap
+                    interval = gap / _POLLS_PER_GAP
+                elif interval is None:
+                    interval = self.min_interval
+                elif result.not_modified or newest == newest_entry:
+                    interval *= _BACKOFF
+                else:
+                    interval *= _SPEEDUP
+                interval = self._clamp(interval)
+                newest_entry = newest
+                next_poll = now + interval
+
+            conn.execute(
+                "INSERT INTO feeds (url, gap, interval, next_poll, last_poll, newest_entry, polls)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET gap = excluded.gap, interval = excluded.interval,"
+                " next_poll = excluded.next_poll, last_poll = excluded.last_poll,"
+                " newest_entry = excluded.newest_entry, polls = excluded.polls",
+                (url, gap, interval, next_poll, now, newest_entry, polls + 1)
+            )
+
+    @staticmethod
+    def _observed_gap(entries):
+        """Median gap in seconds between consecutive entry dates (None without 2+ dates)."""
+        stamps = sorted(set(t for t in (_entry_timestamp(e) for e in entries[:50]) if t), reverse=True)
+        if len(stamps) < 2:
+            return None
+        return statistics.median(a - b for a, b in zip(stamps, stamps[1:]))
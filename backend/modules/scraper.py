@@ -1,25 +1,53 @@
-import feedparser
 import ssl
-from urllib.parse import urlparse, urlunparse
+from modules.dedup_index import normalize_url, as_lookup
+from modules.tagging import NEWS_TAGGER
+from modules.fetcher import FeedFetcher
+from modules.feed_cache import ValidatorCache
+from modules.telemetry import SourceTelemetry
+from modules.scheduler import FeedScheduler
+from modules.tracing import span
 
 # Fix for potential SSL cert issues in some python environments
 if hasattr(ssl, '_create_unverified_context'):
     ssl._create_default_https_context = ssl._create_unverified_context
 
+# How deep into a feed we look for entries not published yet
+SCAN_DEPTH = 10
+
 class Scraper:
-    def __init__(self):
+    def __init__(self, fetcher=None, telemetry=None, scheduler=None):
+        # Per-source timings/yield and auto-disable of chronically failing feeds
+        self.telemetry = telemetry or SourceTelemetry("news")
+        # Only feeds due according to their learned posting cadence are fetched
+        self.scheduler = scheduler or FeedScheduler()
+
+        # Feeds are downloaded concurrently, each with its own timeout
+        self.fetcher = fetcher or FeedFetcher(
+            max_workers=8,
+            timeout=10,
+            deadline=60,
+            host_timeouts={"www.reddit.com": 15, "venturebeat.com": 15},
+            cache=ValidatorCache()
+        )
+
         # Using Dev.to Vue tag RSS as a reliable starting source from the user's list
+        # "parser": "fast" marks well-formed feeds read with the lightweight
+        # iterparse backend (falls back to feedparser if the XML is malformed);
+        # "weight" scales the ranking of the source's candidates (default 1.0)
         self.sources = [
             # --- Vue & Nuxt Ecosystem (Existing) ---
             {
                 "name": "DEV Community (Vue)",
                 "url": "https://dev.to/feed/tag/vue",
-                "type": "news"
+                "type": "news",
+                "parser": "fast",
+                "weight": 0.7
             },
             {
                 "name": "Nuxt Blog",
                 "url": "https://nuxt.com/blog/rss.xml",
-                "type": "news"
+                "type": "news",
+                "weight": 1.3
             },
             {
                 "name": "TabNews",
@@ -66,12 +94,15 @@ class Scraper:
             {
                 "name": "Hacker News",
                 "url": "https://news.ycombinator.com/rss",
-                "type": "news"
+                "type": "news",
+                "parser": "fast",
+                "weight": 0.7
             },
             {
                 "name": "Product Hunt (DevTools)",
                 "url": "https://www.producthunt.com/feed?category=engineering-development",
-                "type": "news"
+                "type": "news",
+                "weight": 0.7
             },
             {
                 "name": "The New Stack (AI)",
@@ -83,7 +114,8 @@ class Scraper:
             {
                 "name": "OpenAI News",
                 "url": "https://openai.com/news/rss.xml",
-                "type": "news"
+                "type": "news",
+                "weight": 1.3
             },
             # {
             #     "name": "Anthropic News",
@@ -93,7 +125,8 @@ class Scraper:
             {
                 "name": "Google AI Blog",
                 "url": "https://research.google/blog/rss/",
-                "type": "news"
+                "type": "news",
+                "weight": 1.3
             },
             {
                 "name": "DeepMind Blog",
@@ -133,7 +166,8 @@ class Scraper:
             {
                 "name": "Hugging Face Blog",
                 "url": "https://huggingface.co/blog/feed.xml",
-                "type": "news"
+                "type": "news",
+                "parser": "fast"
             },
             {
                 "name": "Stability AI Blog",
@@ -194,7 +228,8 @@ class Scraper:
             {
                 "name": "Node.js Blog",
                 "url": "https://nodejs.org/en/feed/blog.xml",
-                "type": "news"
+                "type": "news",
+                "weight": 1.3
             },
             {
                 "name": "NodeSource",
@@ -228,12 +263,14 @@ class Scraper:
             {
                 "name": "Real Python",
                 "url": "https://realpython.com/atom.xml",
-                "type": "news"
+                "type": "news",
+                "parser": "fast"
             },
             {
                 "name": "Planet Python",
                 "url": "https://planetpython.org/rss20.xml",
-                "type": "news"
+                "type": "news",
+                "parser": "fast"
             },
             {
                 "name": "Django Weblog",
@@ -306,19 +343,25 @@ class Scraper:
             {
                  "name": "DEV Community (Automation)",
                  "url": "https://dev.to/feed/tag/automation",
-                 "type": "news"
+                 "type": "news",
+                 "parser": "fast",
+                 "weight": 0.7
             },
 
             # --- Comunidades (New) ---
             {
                 "name": "Reddit (r/Automate)",
                 "url": "https://www.reddit.com/r/Automate/.rss",
-                "type": "news"
+                "type": "news",
+                "parser": "fast",
+                "weight": 0.7
             },
             {
                 "name": "Reddit (r/n8n)",
                 "url": "https://www.reddit.com/r/n8n/.rss",
-                "type": "news"
+                "type": "news",
+                "parser": "fast",
+                "weight": 0.7
             },
             # {
             #     "name": "StackOverflow (Automation)",
@@ -327,28 +370,78 @@ class Scraper:
             # }
         ]
 
-    def get_latest_news(self, limit=1, existing_urls=[]):
+    def get_latest_news(self, limit=1, existing_urls=[], queued_urls=()):
         """
         Fetches the latest news from configured sources.
         Returns a list of dictionaries with 'title', 'link', 'summary', 'source'.
+
+        Links in `queued_urls` (already in the work queue) count as seen, like
+        the published ones: they are not returned again, and a feed keeps its
+        validators unless entries nobody has seen were left past the limit.
         """
         articles = []
         print(f"📡 Iniciando busca de notícias em {len(self.sources)} fontes...")
         
         # Normalize existing URLs for robust comparison (ignoring query params/trailing slashes)
-        normalized_existing = set(self._normalize_url(u) for u in existing_urls)
+        normalized_existing = as_lookup(existing_urls, normalize=self._normalize_url)
+        normalized_queued = {self._normalize_url(url) for url in queued_urls}
 
+        sources = []
         for source in self.sources:
+            if self.telemetry.is_disabled(source['name']):
+                print(f"   🚫 Fonte desativada temporariamente (falhas seguidas): {source['name']}")
+                self.telemetry.record(source['name'], url=source['url'], status="disabled")
+            else:
+                sources.append(source)
+
+        due = self.scheduler.due(sources)
+        if len(due) < len(sources):
+            print(f"   ⏭️ {len(sources) - len(due)} fontes ainda não estão na hora de nova consulta.")
+        sources = due
+
+        def is_new(entry):
+            url = self._normalize_url(entry.get('link', ''))
+            return url not in normalized_existing and url not in normalized_queued
+
+        # Fast-parser feeds stream in and stop downloading once `limit` new entries showed up
+        options = {
+            source['url']: {"parser": "fast", "limit": limit, "accept": is_new, "max_entries": SCAN_DEPTH}
+            for source in sources if source.get('parser') == "fast"
+        }
+        with span("scraper.fetch", feeds=len(sources)) as fetch_span:
+            results = self.fetcher.fetch_all((source['url'] for source in sources), options)
+            fetch_span.set(
+                bytes=sum(result.size for result in results.values()),
+                parse_seconds=round(sum(result.parse_time for result in results.values()), 3),
+                errors=sum(1 for result in results.values() if not result.ok),
+            )
+
+        for source in sources:
+            result = results[source['url']]
+            found = len(articles)
+            error = None
             try:
                 print(f"   Analizando feed: {source['name']}...")
-                # Add User-Agent to avoid blocking by some servers (e.g. Reddit)
-                feed = feedparser.parse(source['url'], agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-                
-                for entry in feed.entries[:limit]:
+                if result.not_modified:
+                    print(f"      💤 Sem novidades (304): {source['name']}")
+                    continue
+                if not result.ok:
+                    print(f"⚠️ Erro ao ler {source['name']}: {result.error}")
+                    continue
+                feed = result.feed
+
+                # Up to `limit` entries not published yet among the newest SCAN_DEPTH
+                for entry in feed.entries[:SCAN_DEPTH]:
                     # Check for duplicates immediately
                     if self._normalize_url(entry.link) in normalized_existing:
                         print(f"      ⚠️ Artigo ignorado (Já existe): {entry.title[:30]}...")
                         continue
+                    if self._normalize_url(entry.link) in normalized_queued:
+                        continue
+                    if len(articles) - found >= limit:
+                        # An unseen entry after the cut must come back on the next run, not as a 304
+                        self.fetcher.forget(source['url'])
+                        break
 
                     # Basic cleaning
                     summary = getattr(entry, 'summary', '') or getattr(entry, 'description', '')
@@ -385,13 +478,16 @@ class Scraper:
                     article['tags'] = self._get_tags(entry.title, getattr(entry, 'summary', ''))
 
                     articles.append(article)
-
-                    # If we just need 'limit' total, we could break here, 
-                    # but usually we want at least one from "limit" per source or total?
-                    # The prompt implies "Pega a primeira notícia encontrada", so we return list.
             except Exception as e:
                 print(f"⚠️ Erro ao ler {source['name']}: {e}")
+                error = str(e)
+            finally:
+                self.scheduler.observe(source['url'], result)
+                entries = len(result.feed.entries) if result.ok else 0
+                self.telemetry.record_fetch(source['name'], result, entries=entries,
+                                            yielded=len(articles) - found, error=error)
 
+        self.telemetry.flush()
         print(f"✅ Encontrados {len(articles)} artigos brutos.")
         return articles
 
@@ -401,45 +497,7 @@ class Scraper:
         Removes query parameters and trailing slashes to ensure unique URL detection
         regardless of tracking params (utm_source, etc).
         """
-        if not url: return " "
-        try:
-            parsed = urlparse(url)
-            # Reconstruct without query (?) or fragment (#)
-            clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
-            return clean_url.rstrip('/')
-        except Exception:
-            return url.rstrip('/')
+        return normalize_url(url)
 
     def _get_tags(self, title, summary=""):
-        import re
-        tags = []
-        text_to_scan = (title + " " + summary).lower()
-
-        def match_keywords(keywords, text):
-            pattern = r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')\b'
-             # C# special case 
-            if 'c#' in keywords and 'c#' in text:
-                 return True
-            return bool(re.search(pattern, text))
-
-        # 1. Vue & Nuxt
-        if match_keywords(['nuxt', 'vue', 'pinia', 'vite', 'composition api', 'vue.js', 'nuxt.js'], text_to_scan):
-            tags.append('Vue&Nuxt')
-
-        # 2. IA Dev
-        if match_keywords(['ia', 'ai', 'gpt', 'claude', 'llm', 'cursor', 'copilot', 'gemini', 'deep seek', 'chatgpt', 'robô', 'agente', 'agent', 'artificial intelligence'], text_to_scan):
-            tags.append('IA Dev')
-
-        # 3. Automações
-        if match_keywords(['n8n', 'automação', 'automacao', 'automation', 'make', 'zapier', 'workflow', 'bot'], text_to_scan):
-            tags.append('Automações')
-
-        # 4. Backend
-        if match_keywords(['python', 'sql', 'database', 'api', 'docker', 'server', 'bun', 'node', 'node.js', 'rust', 'go', 'backend', 'java', 'c#', 'php', 'laravel'], text_to_scan):
-            tags.append('Backend')
-
-        # 5. Vibe Coding (Less likely in articles but good to have)
-        if match_keywords(['vibe', 'setup', 'lo-fi', 'music', 'desk'], text_to_scan):
-             tags.append('Vibe Coding')
-
-        return list(set(tags))
+        return NEWS_TAGGER.classify(title + " " + summary)
@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+# Local state (HTTP validators, indexes, caches) lives outside the repo tree.
+# Override with TECHUB_CACHE_DIR, e.g. to point at a persistent volume.
+CACHE_DIR = os.getenv("TECHUB_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"
+)
+
+
+def cache_path(name):
+    """Returns the absolute path of a file inside the cache dir, creating the dir if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+
+def connect(name):
+    """Opens a SQLite database inside the cache dir (one connection per caller/thread)."""
+    conn = sqlite3.connect(cache_path(name), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
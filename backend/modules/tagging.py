@@ -0,0 +1,99 @@
+import re
+
+
+class TagClassifier:
+    """
+    Keyword-based tagger compiled once into a single regex.
+
+    Each tag becomes a named group inside an optional lookahead, so one
+    finditer() pass over the text reports every tag whose keywords start at a
+    given position (overlapping matches included, e.g. "composition api" counts
+    for both Vue&Nuxt and Backend).
+    """
+
+    def __init__(self, rules, whole_words=True):
+        # rules: ordered list of (tag, [keywords]); tags come back in this order
+        self.tags = [tag for tag, _ in rules]
+        self.groups = [f"t{i}" for i in range(len(rules))]
+
+        any_keyword = []
+        tag_patterns = []
+        first_chars = set()
+        for group, (_, keywords) in zip(self.groups, rules):
+            first_chars.update(k[0] for k in keywords)
+            # Longest first so "node.js" wins over "node" inside the same tag
+            words = [self._keyword(k, whole_words) for k in sorted(set(keywords), key=len, reverse=True)]
+            any_keyword.extend(words)
+            tag_patterns.append(f"(?:(?=(?P<{group}>{'|'.join(words)})))?")
+
+        # The first-char class lets the regex engine skip most positions cheaply
+        first_class = "".join(re.escape(c) for c in sorted(first_chars))
+        self.pattern = re.compile(
+            f"(?=[{first_class}])(?=(?:{'|'.join(any_keyword)})){''.join(tag_patterns)}"
+        )
+
+    @staticmethod
+    def _keyword(keyword, whole_words):
+        pattern = re.escape(keyword)
+        if not whole_words:
+            return pattern
+        # Keywords ending in a symbol ("c#") can't end on a \b: match them anywhere
+        if not re.match(r"\w", keyword[-1]):
+            return pattern
+        if re.match(r"\w", keyword[0]):
+            pattern = r"\b" + pattern
+        return pattern + r"\b"
+
+    def classify(self, text):
+        """Returns the tags whose keywords occur in `text` (case-insensitive), in rule order."""
+        found = set()
+        for match in self.pattern.finditer(text.lower()):
+            for i, group in enumerate(self.groups):
+                if match.group(group) is not None:
+                    found.add(i)
+            if len(found) == len(self.groups):
+                break
+        return [self.tags[i] for i in sorted(found)]
+
+
+# News articles (Scraper)
+NEWS_TAGGER = TagClassifier([
+    ("Vue&Nuxt", ['nuxt', 'vue', 'pinia', 'vite', 'composition api', 'vue.js', 'nuxt.js']),
+    ("IA Dev", ['ia', 'ai', 'gpt', 'claude', 'llm', 'cursor', 'copilot', 'gemini', 'deep seek', 'chatgpt', 'robô', 'agente', 'agent', 'artificial intelligence']),
+    ("Automações", ['n8n', 'automação', 'automacao', 'automation', 'make', 'zapier', 'workflow', 'bot']),
+    ("Backend", ['python', 'sql', 'database', 'api', 'docker', 'server', 'bun', 'node', 'node.js', 'rust', 'go', 'backend', 'java', 'c#', 'php', 'laravel']),
+    ("Vibe Coding", ['vibe', 'setup', 'lo-fi', 'music', 'desk']),
+])
+
+# YouTube video titles (VideoScraper; channel fallbacks live in the scraper)
+VIDEO_TAGGER = TagClassifier([
+    ("Vue&Nuxt", ['nuxt', 'vue', 'pinia', 'vite', 'composition api']),
+    ("IA Dev", ['ia', 'ai', 'gpt', 'claude', 'llm', 'cursor', 'copilot', 'gemini', 'deep seek', 'chatgpt', 'robô', 'agente', 'agent']),
+    ("Automações", ['n8n', 'automação', 'automacao', 'automation', 'make', 'zapier', 'workflow']),
+    ("Backend", ['python', 'sql', 'database', 'api', 'docker', 'server', 'bun', 'node', 'rust', 'go', 'backend', 'java', 'c#']),
+    ("Vibe Coding", ['vibe coding', 'coding vlog', 'setup', 'music for coding', 'study with me']),
+])
+
+# Job titles (JobScraper) -- plain substring match, like the original tag map
+JOB_TAGGER = TagClassifier([
+    ('Go', ['golang', 'go ']),
+    ('Python', ['python']),
+    ('Node.js', ['node', 'nodejs']),
+    ('React', ['react', 'reactjs']),
+    ('Vue.js', ['vue']),
+    ('Angular', ['angular']),
+    ('Java', ['java']),
+    ('Kotlin', ['kotlin']),
+    ('DevOps', ['devops', 'sre']),
+    ('Data', ['data']),
+    ('ML', ['machine learning']),
+    ('Full Stack', ['fullstack', 'full stack']),
+    ('Frontend', ['frontend', 'front end']),
+    ('Backend', ['backend', 'back end']),
+    ('QA', ['qa', 'quality', 'testing']),
+    ('iOS', ['ios', 'swift']),
+    ('Android', ['android']),
+    ('AWS', ['aws']),
+    ('Cloud', ['cloud']),
+    ('TypeScript', ['typescript']),
+], whole_words=False)
@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import threading
+import time
+import config
+from modules.storage import cache_path
+
+# Rotate the JSON lines file once it grows past this size
+_MAX_LOG_BYTES = 5 * 1024 * 1024
+
+# Several pipelines may flush at the same time; health saves are merged
+_save_lock = threading.Lock()
+
+
+class SourceTelemetry:
+    """
+    Per-source metrics of one ingestion sweep (timing, HTTP status, bytes,
+    parse time, entries and yield), appended as JSON lines to
+    `source_metrics.jsonl` and optionally exported as a Prometheus text file.
+
+    Also keeps the health of every source across runs in `source_health.json`
+    so chronic offenders are skipped for a while instead of burning the run.
+    """
+
+    def __init__(self, pipeline, max_failures=None, disable_hours=None, textfile_dir=None):
+        self.pipeline = pipeline
+        self.max_failures = max_failures or config.SOURCE_MAX_FAILURES
+        self.disable_seconds = (disable_hours or config.SOURCE_DISABLE_HOURS) * 3600
+        self.textfile_dir = textfile_dir or config.METRICS_TEXTFILE_DIR
+        self.log_path = cache_path("source_metrics.jsonl")
+        self.health_path = cache_path("source_health.json")
+        self._lock = threading.Lock()
+        self._records = []
+        self._health = self._load_health()
+        self._changes = {}
+
+    def _load_health(self):
+        try:
+            with open(self.health_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _key(self, source):
+        return f"{self.pipeline}:{source}"
+
+    def is_disabled(self, source):
+        """True while a chronically failing source is in its cool-down window."""
+        with self._lock:
+            health = self._health.get(self._key(source)) or {}
+        return health.get("disabled_until", 0) > time.time()
+
+    def record(self, source, url=None, status="ok", http_status=None, elapsed=0.0, size=0,
+               parse_time=0.0, entries=0, yielded=0, error=None):
+        """
+        Records one source of this sweep. `status` is "ok", "not_modified",
+        "error" or "disabled"; only "error" counts as a failure.
+        """
+        record = {
+            "ts": round(time.time(), 3),
+            "pipeline": self.pipeline,
+            "source": source,
+            "url": url,
+            "status": status,
+            "http_status": http_status,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "bytes": size,
+            "parse_ms": round(parse_time * 1000, 1),
+            "entries": entries,
+            "yield": yielded,
+            "error": error,
+        }
+        with self._lock:
+            self._records.append(record)
+            if status != "disabled":
+                self._update_health(source, record)
+
+    def record_fetch(self, source, result, entries=0, yielded=0, error=None):
+        """
+        Shortcut for a FetchResult coming from FeedFetcher. `error` notes a
+        failure while reading the entries (the source still answered).
+        """
+        if result.not_modified:
+            status = "not_modified"
+        elif result.ok:
+            status = "ok"
+        else:
+            status = "error"
+        self.record(source, url=result.url, status=status, http_status=result.status,
+                    elapsed=result.elapsed, size=result.size, parse_time=result.parse_time,
+                    entries=entries, yielded=yielded, error=result.error or error)
+
+    def _update_health(self, source, record):
+        key = self._key(source)
+        health = dict(self._health.get(key) or {})
+        if record["status"] == "error":
+            health["consecutive_failures"] = health.get("consecutive_failures", 0) + 1
+            health["last_error"] = record["error"]
+            if health["consecutive_failures"] >= self.max_failures:
+                health["disabled_until"] = record["ts"] + self.disable_seconds
+        else:
+            health = {"consecutive_failures": 0, "last_ok": record["ts"]}
+        self._health[key] = health
+        self._changes[key] = health
+
+    def flush(self):
+        """Writes this sweep's records and health changes, and prints a short summary."""
+        with self._lock:
+            records, self._records = self._records, []
+            changes, self._changes = self._changes, {}
+        if not records:
+            return
+
+        with _save_lock:
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > _MAX_LOG_BYTES:
+                os.replace(self.log_path, self.log_path + ".1")
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            if changes:
+                health = self._load_health()
+                health.update(changes)
+                tmp_path = self.health_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(health, f, indent=2, sort_keys=True, ensure_ascii=False)
+                os.replace(tmp_path, self.health_path)
+
+        if self.textfile_dir:
+            self._write_textfile(records)
+        self._print_summary(records)
+
+    def _write_textfile(self, records):
+        metrics = [
+            ("techub_source_fetch_seconds", "Download time of the source", lambda r: r["elapsed_ms"] / 1000),
+            ("techub_source_parse_seconds", "Feed parse time", lambda r: r["parse_ms"] / 1000),
+            ("techub_source_bytes", "Response body size", lambda r: r["bytes"]),
+            ("techub_source_entries", "Entries in the feed", lambda r: r["entries"]),
+            ("techub_source_yield", "New items taken from the source", lambda r: r["yield"]),
+            ("techub_source_up", "1 when the source answered (200 or 304)", lambda r: int(r["status"] in ("ok", "not_modified"))),
+        ]
+        lines = []
+        for name, help_text, value in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for record in records:
+                if record["status"] == "disabled":
+                    continue
+                source = record["source"].replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{pipeline="{self.pipeline}",source="{source}"}} {value(record)}')
+
+        os.makedirs(self.textfile_dir, exist_ok=True)
+        # Write + rename so the collector never reads a half-written file
+        path = os.path.join(self.textfile_dir, f"techub_{re.sub(r'[^a-z0-9_]', '_', self.pipeline.lower())}.prom")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+    def _print_summary(self, records):
+        failed = [r for r in records if r["status"] == "error"]
+        disabled = [r for r in records if r["status"] == "disabled"]
+        slowest = sorted(records, key=lambda r: r["elapsed_ms"], reverse=True)[:3]
+        total_seconds = sum(r["elapsed_ms"] for r in records) / 1000
+        print(f"📊 Telemetria ({self.pipeline}): {len(records)} fontes, {len(failed)} com erro, "
+              f"{len(disabled)} desativadas, {total_seconds:.1f}s somados de download.")
+        if slowest and slowest[0]["elapsed_ms"]:
+            print("   🐢 Mais lentas: " + ", ".join(f"{r['source']} ({r['elapsed_ms'] / 1000:.1f}s)" for r in slowest))
+        with self._lock:
+            newly_disabled = [
+                r["source"] for r in failed
+                if (self._health.get(self._key(r["source"])) or {}).get("disabled_until", 0) > r["ts"]
+            ]
+        for source in newly_disabled:
+            print(f"   🚫 {source} desativada por {self.disable_seconds / 3600:g}h após "
+                  f"{self.max_failures}+ falhas seguidas.")
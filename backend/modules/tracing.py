@@ -0,0 +1,195 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+import config
+from modules.storage import cache_path
+
+# Rotate the JSON lines file once it grows past this size
+_MAX_LOG_BYTES = 5 * 1024 * 1024
+
+# Attributes summed over a whole trace in the console report
+_TOTALS = ("bytes", "prompt_tokens", "completion_tokens", "cost_usd")
+
+_current = contextvars.ContextVar("techub_span", default=None)
+
+
+class Span:
+    """One timed operation: name, parent, duration, status and free-form attributes."""
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self.depth = parent.depth + 1 if parent else 0
+        # Finished spans of the trace, collected on the root for the console report
+        self._finished = []
+        self._lock = threading.Lock()
+
+    def set(self, **attributes):
+        """Sets attributes (e.g. model, cached, status codes)."""
+        self.attributes.update(attributes)
+
+    def add(self, **amounts):
+        """Adds to numeric attributes (e.g. bytes=len(chunk))."""
+        with self._lock:
+            for key, value in amounts.items():
+                self.attributes[key] = self.attributes.get(key, 0) + (value or 0)
+
+    def fail(self, error):
+        """Marks the span as failed for errors the code handles without raising."""
+        self.status = "error"
+        self.error = str(error)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": round(self.start, 3),
+            "duration_ms": round(self.duration * 1000, 1),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class ConsoleExporter:
+    """Prints the span tree of a trace, with totals, when its root span ends."""
+
+    def export(self, span):
+        if span.parent:
+            return
+        spans = sorted(span._finished, key=lambda s: s.start)
+        children = {}
+        for s in spans:
+            children.setdefault(s.parent, []).append(s)
+        print(f"\n🧭 Trace {span.name}: {span.duration:.1f}s")
+
+        # Depth-first, so work started in pool threads stays under its parent
+        stack = list(reversed(children.get(span, [])))
+        while stack:
+            s = stack.pop()
+            details = ", ".join(f"{key}={_fmt(value)}" for key, value in s.attributes.items())
+            status = "" if s.status == "ok" else f" ❌ {s.error}"
+            print(f"   {'  ' * (s.depth - 1)}└ {s.name} {s.duration:.2f}s" + (f" ({details})" if details else "") + status)
+            stack.extend(reversed(children.get(s, [])))
+
+        totals = {key: sum(s.attributes.get(key) or 0 for s in spans) for key in _TOTALS}
+        if any(totals.values()):
+            print(f"   Σ {totals['bytes'] / 1024:.0f} KB transferidos, "
+                  f"{totals['prompt_tokens']} tokens de entrada / {totals['completion_tokens']} de saída, "
+                  f"~US$ {totals['cost_usd']:.4f}")
+
+
+class JsonlExporter:
+    """Appends every finished span to `traces.jsonl` in the cache dir."""
+
+    _lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            path = cache_path("traces.jsonl")
+            if os.path.exists(path) and os.path.getsize(path) > _MAX_LOG_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return value
+
+
+class Tracer:
+    """
+    Minimal span API: `with tracer.span("stage", key=value) as span:` times
+    the block, nests it under the span active in this context and hands the
+    finished span to the exporters.
+    """
+
+    def __init__(self, exporters=None):
+        if exporters is None:
+            exporters = []
+            if "console" in config.TRACING:
+                exporters.append(ConsoleExporter())
+            if "jsonl" in config.TRACING:
+                exporters.append(JsonlExporter())
+        self.exporters = exporters
+
+    @contextmanager
+    def span(self, name, **attributes):
+        span = Span(name, _current.get(), attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = str(e) or type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._started
+            _current.reset(token)
+            with span.root._lock:
+                span.root._finished.append(span)
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except Exception as e:
+                    print(f"⚠️ Falha ao exportar trace: {e}")
+
+
+class _NoSpan:
+    """Stand-in returned by current() outside any span: attributes are dropped."""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, **amounts):
+        pass
+
+    def fail(self, error):
+        pass
+
+
+tracer = Tracer()
+
+
+def span(name, **attributes):
+    """Context manager timing a stage under the current span (see Tracer.span)."""
+    return tracer.span(name, **attributes)
+
+
+def current():
+    """The active span, to attach attributes from deeper code (never None)."""
+    return _current.get() or _NoSpan()
+
+
+def wrap(func):
+    """
+    Binds `func` to the span active now, for work submitted to thread pools
+    (new threads don't inherit the caller's context).
+    """
+    parent = _current.get()
+
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
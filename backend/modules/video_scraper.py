@@ -1,8 +1,18 @@
-import feedparser
 import datetime
+import re
+from modules.fetcher import FeedFetcher
+from modules.feed_cache import ValidatorCache
+from modules.dedup_index import as_lookup
+from modules.tagging import VIDEO_TAGGER
+from modules.telemetry import SourceTelemetry
+
+_IA_WORD = re.compile(r'\bia\b')
 
 class VideoScraper:
-    def __init__(self):
+    def __init__(self, fetcher=None, telemetry=None):
+        self.fetcher = fetcher or FeedFetcher(cache=ValidatorCache())
+        self.telemetry = telemetry or SourceTelemetry("videos")
+
         # List of Channel IDs
         # Fireship, Nuxt, Vue.js, Rocketseat (BR), Filipe Deschamps (BR)
         self.channels = [
@@ -20,64 +30,69 @@ class VideoScraper:
         ]
 
     def _get_tags(self, title, channel_name):
-        tags = []
         title_lower = title.lower()
+        found = VIDEO_TAGGER.classify(title_lower)
+        tags = list(found)
 
-        def match_keywords(keywords, text):
-            import re
-            pattern = r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')\b'
-            # C# special case (boundary doesn't work well with #)
-            if 'c#' in keywords and 'c#' in text:
-                 return True
-            return bool(re.search(pattern, text))
-
-        # 1. Vue & Nuxt (Prioritize these Frameworks)
-        if match_keywords(['nuxt', 'vue', 'pinia', 'vite', 'composition api'], title_lower):
-            tags.append('Vue&Nuxt')
-        elif channel_name in ['Nuxt', 'Rodrigo Rahman']: # Channel fallback
-           if not match_keywords(['ia'], title_lower): # Avoid tagging AI videos from these channels purely as Vue/Nuxt if they are about AI
-               tags.append('Vue&Nuxt')
+        # Channel fallbacks when the title itself has no keyword for the category
+        # 1. Vue & Nuxt (avoid tagging AI videos from these channels purely as Vue/Nuxt)
+        if 'Vue&Nuxt' not in found and channel_name in ['Nuxt', 'Rodrigo Rahman']:
+            if not _IA_WORD.search(title_lower):
+                tags.append('Vue&Nuxt')
 
         # 2. IA Dev (AI for Developers)
-        if match_keywords(['ia', 'ai', 'gpt', 'claude', 'llm', 'cursor', 'copilot', 'gemini', 'deep seek', 'chatgpt', 'robô', 'agente', 'agent'], title_lower):
-            tags.append('IA Dev')
-        elif channel_name in ['Matheus | IA Coding', 'AI Coders Academy']:
+        if 'IA Dev' not in found and channel_name in ['Matheus | IA Coding', 'AI Coders Academy']:
             tags.append('IA Dev')
 
         # 3. Automações (N8N, Automation)
-        if match_keywords(['n8n', 'automação', 'automacao', 'automation', 'make', 'zapier', 'workflow'], title_lower):
-            tags.append('Automações')
-        elif channel_name in ['Luciana Papini', 'Enzo Sparo', 'Helio Arreche', 'Rafael Melgaço']:
-             # Enzo and Helio talk a lot about AI too, so check simple overlap
+        if 'Automações' not in found and channel_name in ['Luciana Papini', 'Enzo Sparo', 'Helio Arreche', 'Rafael Melgaço']:
             tags.append('Automações')
 
-        # 4. Backend (General Backend Tech)
-        if match_keywords(['python', 'sql', 'database', 'api', 'docker', 'server', 'bun', 'node', 'rust', 'go', 'backend', 'java', 'c#'], title_lower):
-            tags.append('Backend')
-
-        # 5. Vibe Coding (Lifestyle / Vlog)
-        if match_keywords(['vibe coding', 'coding vlog', 'setup', 'music for coding', 'study with me'], title_lower):
-             tags.append('Vibe Coding')
-
         # Fallback
         if not tags:
             tags.append('Tech')
             
-        return list(set(tags)) # Remove duplicates
+        return tags
 
     def get_latest_videos(self, limit=2, existing_urls=[]):
         print(f"🎬 Buscando vídeos recientes no YouTube RSS...")
         videos = []
+        existing_urls = as_lookup(existing_urls)
         
+        channels = []
         for channel in self.channels:
-            url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel['id']}"
-            feed = feedparser.parse(url)
+            if self.telemetry.is_disabled(channel['name']):
+                print(f"   🚫 Canal desativado temporariamente (falhas seguidas): {channel['name']}")
+                self.telemetry.record(channel['name'], status="disabled")
+            else:
+                channels.append(channel)
+
+        feed_urls = {
+            channel['id']: f"https://www.youtube.com/feeds/videos.xml?channel_id={channel['id']}"
+            for channel in channels
+        }
+        def is_new(entry):
+            return f"https://www.youtube.com/watch?v={entry.get('yt_videoid')}" not in existing_urls
+
+        # YouTube channel feeds are well-formed Atom: parse them while they stream
+        # in and stop once `limit` videos not saved yet were read
+        options = {url: {"parser": "fast", "limit": limit, "accept": is_new} for url in feed_urls.values()}
+        results = self.fetcher.fetch_all(feed_urls.values(), options)
+
+        for channel in channels:
+            result = results[feed_urls[channel['id']]]
+            if result.not_modified or not result.ok:
+                self.telemetry.record_fetch(channel['name'], result)
+            if result.not_modified:
+                print(f"   💤 Sem vídeos novos (304): {channel['name']}")
+                continue
+            if not result.ok:
+                print(f"   ⚠️ Erro ao ler canal {channel['name']}: {result.error}")
+                continue
+            feed = result.feed
             
             count = 0
             for entry in feed.entries:
-                if count >= limit:
-                    break
-                    
                 # Parse entry
                 # atom content: video id, published, title, thumbnail (media_thumbnail)
                 
@@ -89,6 +104,11 @@ class VideoScraper:
                     print(f"   ⚠️ Vídeo duplicado ignorado: {entry.title}")
                     continue
 
+                if count >= limit:
+                    # A new video after the cut must come back on the next run, not as a 304
+                    self.fetcher.forget(feed_urls[channel['id']])
+                    break
+
                 # Use thumbnail from feed (usually hqdefault) to ensure it exists
                 if 'media_thumbnail' in entry and len(entry.media_thumbnail) > 0:
                     thumbnail = entry.media_thumbnail[0]['url']
@@ -113,7 +133,11 @@ class VideoScraper:
                 
                 videos.append(video)
                 count += 1
+
+            self.telemetry.record_fetch(channel['name'], result, entries=len(feed.entries), yielded=count)
                 
+        self.telemetry.flush()
+
         # Shuffle to mix channels
         import random
         random.shuffle(videos)
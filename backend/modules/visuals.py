@@ -1,76 +1,255 @@
 from google import genai
 from google.genai import types
 from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 import os
 import io
+import json
+import re
+import hashlib
 import config
 from supabase import create_client
+from modules.image_variants import ImageProcessor
+from modules.image_index import ImageHashIndex, dhash
+from modules.http_client import default_client
+from modules import tracing
+from modules.tracing import span
+
+# Limits for copying third-party thumbnails into our bucket
+MAX_SOURCE_IMAGE_BYTES = 8 * 1024 * 1024
+SOURCE_IMAGE_TIMEOUT = (5, 15)  # (connect, read) seconds
+
+IMAGE_MODEL = "gemini-2.5-flash-image"
+# Approximate US$ per generated image, for the cost estimate in the traces
+IMAGE_COST_USD = 0.039
 
 class VisualGenerator:
-    def __init__(self):
+    def __init__(self, supabase=None):
         if not config.NANO_BANANA_KEY:
             print("⚠️ AVISO: NANO_BANANA_KEY não encontrada. Geração de imagem desativada.")
             self.client = None
         else:
             self.client = genai.Client(api_key=config.NANO_BANANA_KEY)
         
-        self.supabase = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+        self.supabase = supabase or create_client(*config.supabase_credentials())
         self.bucket = "blog-images"
+        self.processor = ImageProcessor(preset=config.IMAGE_QUALITY)
+        self.image_index = ImageHashIndex()
 
     def generate_and_upload_image(self, title, slug):
         """
         Generates an image via Gemini 2.5 (Nano Banana), saves to buffer,
         uploads to Supabase Storage, and returns public URL.
         """
+        image_bytes = self.generate_image(title)
+        if not image_bytes:
+            return None
+        return self.upload_image(slug, image_bytes)
+
+    def generate_image(self, title):
+        """Generates the cover image and returns its PNG bytes (None on failure)."""
         if not self.client:
             return None
 
-        print(f"🎨 Gerando imagem para: '{title}'...")
+        with span("visuals.generate", model=IMAGE_MODEL) as current_span:
+            print(f"🎨 Gerando imagem para: '{title}'...")
         
-        # Engenharia de Prompt para Capa de Blog Tech
-        prompt = (
-            f"Create a high quality, modern, abstract tech blog header image for an article titled '{title}'. "
-            "Style: Digital art, vibrant colors, futuristic, minimal, gradient lighting, 4k. "
-            "No text overlays."
-        )
-
-        try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash-image",
-                contents=[prompt],
+            # Engenharia de Prompt para Capa de Blog Tech
+            prompt = (
+                f"Create a high quality, modern, abstract tech blog header image for an article titled '{title}'. "
+                "Style: Digital art, vibrant colors, futuristic, minimal, gradient lighting, 4k. "
+                "No text overlays."
             )
 
-            generated_image = None
-            for part in response.parts:
-                if part.inline_data is not None:
-                    generated_image = part.as_image()
-                    break
+            try:
+                response = self.client.models.generate_content(
+                    model=IMAGE_MODEL,
+                    contents=[prompt],
+                )
+
+                generated_image = None
+                for part in response.parts:
+                    if part.inline_data is not None:
+                        generated_image = part.as_image()
+                        break
             
-            if not generated_image:
-                print("❌ Nenhuma imagem retornada pelo modelo.")
+                if not generated_image:
+                    print("❌ Nenhuma imagem retornada pelo modelo.")
+                    current_span.fail("Nenhuma imagem retornada")
+                    return None
+
+                # Extract Bytes directly from Google GenAI Image object
+                current_span.set(bytes=len(generated_image.image_bytes), cost_usd=IMAGE_COST_USD)
+                return generated_image.image_bytes
+
+            except Exception as e:
+                print(f"❌ Erro na geração de imagem: {e}")
+                current_span.fail(e)
                 return None
 
-            # Extract Bytes directly from Google GenAI Image object
-            img_byte_arr = generated_image.image_bytes
+    def _download_source_image(self, image_url):
+        """Downloads a remote image, enforcing the size cap and timeouts. Returns bytes or None."""
+        response = default_client().get(
+            image_url,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; TechHubBot/1.0)"},
+            timeout=SOURCE_IMAGE_TIMEOUT,
+            stream=True
+        )
+        try:
+            if response.status_code != 200:
+                print(f"   ⚠️ Imagem da fonte indisponível: HTTP {response.status_code}")
+                return None
+            content_type = response.headers.get("Content-Type", "")
+            if content_type and not content_type.startswith("image/"):
+                print(f"   ⚠️ URL da fonte não é uma imagem ({content_type}).")
+                return None
+            if int(response.headers.get("Content-Length") or 0) > MAX_SOURCE_IMAGE_BYTES:
+                print("   ⚠️ Imagem da fonte grande demais, ignorada.")
+                return None
 
-            # Upload to Supabase
-            file_path = f"{slug}.png"
-            print(f"☁️ Enviando imagem para Supabase Storage: {file_path}...")
-            
-            # Tenta remover anterior se existir (opcional, mas evita erro de duplicata)
-            # self.supabase.storage.from_(self.bucket).remove([file_path]) 
+            data = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                data.extend(chunk)
+                if len(data) > MAX_SOURCE_IMAGE_BYTES:
+                    print("   ⚠️ Imagem da fonte grande demais, ignorada.")
+                    return None
+            tracing.current().add(bytes=len(data))
+            return bytes(data)
+        finally:
+            response.close()
 
-            self.supabase.storage.from_(self.bucket).upload(
-                path=file_path,
-                file=img_byte_arr,
-                file_options={"content-type": "image/png", "upsert": "true"}
-            )
+    def ingest_remote_image(self, image_url, slug):
+        """
+        Copies a scraped thumbnail into our bucket so the frontend never hotlinks
+        third-party origins. The image is downloaded once (size/time capped),
+        deduplicated by content and perceptual hash, and re-encoded through the
+        same variant pipeline as generated covers. Returns our public URL or None.
+        """
+        with span("visuals.ingest") as current_span:
+            try:
+                known_url = self.image_index.by_source(image_url)
+                if known_url:
+                    print(f"♻️ Imagem da fonte já importada: {known_url}")
+                    current_span.set(reused="source")
+                    return known_url
+
+                data = self._download_source_image(image_url)
+                if not data:
+                    return None
+
+                sha256 = hashlib.sha256(data).hexdigest()
+                with Image.open(io.BytesIO(data)) as image:
+                    phash = dhash(image)
 
-            # Get Public URL
-            public_url = self.supabase.storage.from_(self.bucket).get_public_url(file_path)
-            print(f"✅ Imagem salva: {public_url}")
-            return public_url
+                duplicate = self.image_index.find(sha256, phash)
+                if duplicate:
+                    self.image_index.link(image_url, duplicate[0])
+                    print(f"♻️ Mesma imagem já está no Storage: {duplicate[1]}")
+                    current_span.set(reused="content")
+                    return duplicate[1]
 
+                manifest = self.upload_variants(slug, data)
+                if not manifest:
+                    return None
+                self.image_index.add(image_url, sha256, phash, manifest["src"])
+                return manifest["src"]
+
+            except Exception as e:
+                print(f"❌ Erro ao importar imagem da fonte: {e}")
+                current_span.fail(e)
+                return None
+
+    def upload_image(self, slug, img_byte_arr):
+        """
+        Uploads the image (as responsive variants) to Supabase Storage and returns
+        the public URL of the 1200x630 card (None on failure).
+        """
+        manifest = self.upload_variants(slug, img_byte_arr)
+        return manifest["src"] if manifest else None
+
+    def _upload_file(self, file_path, data, content_type):
+        self.supabase.storage.from_(self.bucket).upload(
+            path=file_path,
+            file=data,
+            file_options={"content-type": content_type, "upsert": "true"}
+        )
+        return self.supabase.storage.from_(self.bucket).get_public_url(file_path)
+
+    def remove_image(self, slug):
+        """
+        Deletes the files uploaded for `slug` (variants, manifest or PNG), e.g. a
+        cover started early for an article that then failed. Returns how many.
+        """
+        pattern = re.compile(re.escape(slug) + r"(-\d+w)?\.\w+")
+        try:
+            bucket = self.supabase.storage.from_(self.bucket)
+            files = bucket.list(options={"search": slug})
+            paths = [f["name"] for f in files if pattern.fullmatch(f["name"])]
+            if paths:
+                bucket.remove(paths)
+                print(f"🗑️ Imagem descartada do Storage: {slug} ({len(paths)} arquivos)")
+            return len(paths)
         except Exception as e:
-            print(f"❌ Erro na geração/upload de imagem: {e}")
-            return None
+            print(f"⚠️ Falha ao remover imagem {slug}: {e}")
+            return 0
+
+    def upload_variants(self, slug, img_byte_arr):
+        """
+        Resizes/encodes the image (card + srcset widths, WebP/AVIF), uploads every
+        variant in parallel plus a `{slug}.json` manifest, and returns the manifest:
+        {"src": card URL, "width", "height", "variants": [{width, height, format, url}]}.
+        Falls back to the original PNG when the image can't be processed.
+        """
+        with span("visuals.upload") as current_span:
+            try:
+                variants = self.processor.variants(img_byte_arr)
+            except Exception as e:
+                print(f"⚠️ Falha ao processar variantes ({e}). Enviando PNG original.")
+                variants = None
+
+            try:
+                if not variants:
+                    file_path = f"{slug}.png"
+                    print(f"☁️ Enviando imagem para Supabase Storage: {file_path}...")
+                    public_url = self._upload_file(file_path, img_byte_arr, "image/png")
+                    current_span.set(variants=1, bytes=len(img_byte_arr))
+                    print(f"✅ Imagem salva: {public_url}")
+                    return {"src": public_url, "variants": []}
+
+                card_width = variants[0]["width"]
+                paths = []
+                for v in variants:
+                    suffix = "" if v["width"] == card_width else f"-{v['width']}w"
+                    paths.append(f"{slug}{suffix}.{v['format']}")
+
+                total_bytes = sum(len(v["data"]) for v in variants)
+                current_span.set(variants=len(variants), bytes=total_bytes)
+                total_kb = total_bytes / 1024
+                print(f"☁️ Enviando {len(variants)} variantes para Supabase Storage ({total_kb:.0f} KB): {slug}...")
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    urls = list(executor.map(
+                        lambda item: self._upload_file(item[0], item[1]["data"], item[1]["content_type"]),
+                        zip(paths, variants)
+                    ))
+
+                manifest = {
+                    "src": urls[0],
+                    "width": variants[0]["width"],
+                    "height": variants[0]["height"],
+                    "variants": [
+                        {"width": v["width"], "height": v["height"], "format": v["format"], "url": url}
+                        for v, url in zip(variants, urls)
+                    ],
+                }
+                self._upload_file(
+                    f"{slug}.json",
+                    json.dumps(manifest, indent=2).encode("utf-8"),
+                    "application/json"
+                )
+                print(f"✅ Imagem salva: {manifest['src']}")
+                return manifest
+
+            except Exception as e:
+                print(f"❌ Erro no upload de imagem: {e}")
+                current_span.fail(e)
+                return None
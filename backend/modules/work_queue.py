@@ -0,0 +1,161 @@
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import closing
+from modules.storage import connect
+
+# Article stages, in order. Items leave the flow as "skipped" (e.g. duplicate
+# slug) or "failed" (too many attempts).
+STAGES = ("scraped", "generated", "imaged", "published")
+DONE = ("published", "skipped", "failed")
+
+
+class WorkQueue:
+    """
+    Durable queue of article candidates (SQLite in the cache dir).
+
+    Each item moves scraped -> generated -> imaged -> published, and its
+    payload (the scraped news, then the generated article, then the image URL)
+    is saved at every step. A worker claims items of one stage under a lease
+    and keeps it (renewed) as the item advances, until it is published,
+    skipped or failed; if the process dies, the lease expires and the next run
+    picks the item up at the stage it reached, so the OpenAI and Gemini calls
+    already paid for are not repeated.
+    """
+
+    def __init__(self, db_name="work_queue.sqlite3", lease_seconds=15 * 60, max_attempts=3,
+                 scraped_ttl_days=3, done_ttl_days=14):
+        self.db_name = db_name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Unprocessed news goes stale; finished items are kept for a while for inspection
+        self.scraped_ttl = scraped_ttl_days * 24 * 3600
+        self.done_ttl = done_ttl_days * 24 * 3600
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " key TEXT PRIMARY KEY, stage TEXT, payload TEXT, priority REAL, attempts INTEGER DEFAULT 0,"
+                " lease_owner TEXT, lease_until REAL, last_error TEXT,"
+                " created_at REAL, updated_at REAL"
+                ")"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(items)")]
+            if "priority" not in columns:
+                conn.execute("ALTER TABLE items ADD COLUMN priority REAL")
+            conn.execute("DROP INDEX IF EXISTS items_stage")
+            conn.execute("CREATE INDEX IF NOT EXISTS items_stage_priority ON items (stage, priority DESC, created_at)")
+
+    def enqueue(self, items, key="link", priority=None):
+        """
+        Adds new items at the "scraped" stage (known keys are ignored), ranked
+        by `priority(item)` when given. Returns how many were added.
+        """
+        now = time.time()
+        added = 0
+        with closing(connect(self.db_name)) as conn, conn:
+            self._expire(conn, now)
+            for item in items:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO items (key, stage, payload, priority, created_at, updated_at)"
+                    " VALUES (?, 'scraped', ?, ?, ?, ?)",
+                    (item[key], json.dumps({"news": item}, ensure_ascii=False),
+                     priority(item) if priority else None, now, now)
+                )
+                added += cursor.rowcount
+        return added
+
+    def keys(self):
+        """Keys of every item still in the queue, whatever its stage."""
+        with closing(connect(self.db_name)) as conn:
+            return {key for (key,) in conn.execute("SELECT key FROM items")}
+
+    def waiting(self, stage):
+        """Number of unleased items waiting at `stage`."""
+        with closing(connect(self.db_name)) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM items WHERE stage = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (stage, time.time())
+            ).fetchone()[0]
+
+    def claim(self, stage, limit=None):
+        """
+        Leases unleased items of `stage` (all of them or the `limit` best ones)
+        to this process. Returns [(key, payload)], best first.
+        """
+        now = time.time()
+        owner = f"{self.owner}:{threading.get_ident()}"
+        query = ("SELECT key, payload FROM items WHERE stage = ? AND (lease_until IS NULL OR lease_until < ?)"
+                 " ORDER BY priority DESC, created_at")
+        params = [stage, now]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with closing(connect(self.db_name)) as conn:
+            # IMMEDIATE takes the write lock up front: two workers can't lease the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(query, params).fetchall()
+                conn.executemany(
+                    "UPDATE items SET lease_owner = ?, lease_until = ? WHERE key = ?",
+                    [(owner, now + self.lease_seconds, key) for key, _ in rows]
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return [(key, json.loads(payload)) for key, payload in rows]
+
+    def advance(self, key, stage, payload):
+        """
+        Saves the item's new payload at `stage`. The lease is renewed, since the
+        same worker goes on with the next stage, and released once `stage` is final.
+        """
+        now = time.time()
+        lease_until = None if stage in DONE else now + self.lease_seconds
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "UPDATE items SET stage = ?, payload = ?, attempts = 0,"
+                " lease_owner = CASE WHEN ? IS NULL THEN NULL ELSE lease_owner END, lease_until = ?,"
+                " last_error = NULL, updated_at = ? WHERE key = ?",
+                (stage, json.dumps(payload, ensure_ascii=False), lease_until, lease_until, now, key)
+            )
+
+    def fail(self, key, error):
+        """Releases the item for a later retry; after `max_attempts` it is parked as "failed"."""
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "UPDATE items SET attempts = attempts + 1, lease_owner = NULL, lease_until = NULL,"
+                " last_error = ?, updated_at = ?,"
+                " stage = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE stage END"
+                " WHERE key = ?",
+                (str(error), time.time(), self.max_attempts, key)
+            )
+
+    def skip(self, key, reason):
+        """Takes the item out of the flow for good (e.g. its slug already exists)."""
+        with closing(connect(self.db_name)) as conn, conn:
+            conn.execute(
+                "UPDATE items SET stage = 'skipped', lease_owner = NULL, lease_until = NULL,"
+                " last_error = ?, updated_at = ? WHERE key = ?",
+                (reason, time.time(), key)
+            )
+
+    def counts(self):
+        """Returns {stage: number of items}."""
+        with closing(connect(self.db_name)) as conn:
+            return dict(conn.execute("SELECT stage, COUNT(*) FROM items GROUP BY stage").fetchall())
+
+    def _expire(self, conn, now):
+        conn.execute(
+            "DELETE FROM items WHERE stage = 'scraped' AND (lease_until IS NULL OR lease_until < ?)"
+            " AND created_at < ?",
+            (now, now - self.scraped_ttl)
+        )
+        conn.execute(
+            f"DELETE FROM items WHERE stage IN ({','.join('?' * len(DONE))}) AND updated_at < ?",
+            (*DONE, now - self.done_ttl)
+        )
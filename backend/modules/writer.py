@@ -1,23 +1,72 @@
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import random
+import re
+import json
+import time
 import json_repair
 import config
+from modules.llm_cache import LLMCache
+from modules.llm_json import parse_completion
+from modules import tracing
+from modules.tracing import span
+
+# US$ per million tokens (input, output), for the cost estimate in the traces
+PRICING_PER_MTOKEN = {"gpt-4o-mini": (0.15, 0.60)}
+
+class _HeaderExtractor:
+    """
+    Pulls the short fields (title, slug, tags) out of a JSON completion while
+    it is still streaming, so callers can act before `content` is finished.
+    """
+
+    FIELDS = {
+        "title": re.compile(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"'),
+        "slug": re.compile(r'"slug"\s*:\s*"((?:[^"\\]|\\.)*)"'),
+        "tags": re.compile(r'"tags"\s*:\s*(\[[^\]]*\])'),
+    }
 
-class ContentGenerator:
     def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            print("⚠️ AVISO: OPENAI_API_KEY não encontrada no .env. A geração de texto falhará.")
-        
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-4o-mini" # Cost-effective and fast
+        self.buffer = ""
+        self.header = {}
+
+    def feed(self, chunk):
+        """Adds streamed text. Returns the header dict once every field is known."""
+        self.buffer += chunk
+        for name, pattern in self.FIELDS.items():
+            if name in self.header:
+                continue
+            match = pattern.search(self.buffer)
+            if match:
+                value = match.group(1)
+                self.header[name] = json_repair.loads(value) if name == "tags" else json.loads(f'"{value}"', strict=False)
+        return self.header if len(self.header) == len(self.FIELDS) else None
 
-    def generate_article(self, scraped_item):
-        """
-        Generates a full blog post based on the scraped item.
-        """
-        print(f"🤖 Gerando artigo para: '{scraped_item['title']}'...")
 
+class ContentGenerator:
+    def __init__(self, max_workers=None, max_retries=5, bypass_cache=None, client=None):
+        # client: an OpenAI-compatible client (e.g. the fixture replayer); built from the env otherwise
+        if client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                print("⚠️ AVISO: OPENAI_API_KEY não encontrada no .env. A geração de texto falhará.")
+            client = OpenAI(api_key=api_key)
+        self.client = client
+        self.model = "gpt-4o-mini" # Cost-effective and fast
+        self.temperature = 0.7
+        # Parallel completions in batch mode and how many times a 429 is retried
+        self.max_workers = max_workers or config.WRITER_CONCURRENCY
+        self.max_retries = max_retries
+        # bypass_cache skips lookups (fresh completion) but still refreshes the cache
+        self.bypass_cache = config.LLM_CACHE_BYPASS if bypass_cache is None else bypass_cache
+        self.cache = LLMCache(
+            ttl=config.LLM_CACHE_TTL_HOURS * 3600,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES
+        )
+
+    def _build_prompts(self, scraped_item):
+        """Returns (system_prompt, user_prompt) for the scraped item."""
         system_prompt = (
             "Você é um Desenvolvedor Sênior Especialista em Vue.js, Nuxt e Automação. "
             "Você escreve para o blog TechHub. Seu tom é técnico, direto ('Vibe Coding'), entusiasta, mas profissional. "
@@ -51,37 +100,173 @@ class ContentGenerator:
            - "Backend": Para Python, APIs, Banco de Dados, Docker.
            - "Vibe Coding": Apenas se for sobre lifestyle/setup (raro para notícias).
 
-        Retorne APENAS um JSON válido (sem markdown code blocks ```json) com a seguinte estrutura:
+        Retorne APENAS um JSON válido (sem markdown code blocks ```json) com a seguinte estrutura,
+        mantendo exatamente esta ordem de campos ("content" sempre por último):
         {{
             "title": "Seu Título Aqui",
             "slug": "seu-slug-aqui",
-            "content": "Conteúdo markdown completo aqui...",
-            "excerpt": "Resumo curto de 1-2 frases para o card.",
             "tags": ["Tag1", "Tag2"],
+            "excerpt": "Resumo curto de 1-2 frases para o card.",
             "original_url": "{scraped_item['link']}",
-            "type": "{scraped_item['type']}"
+            "type": "{scraped_item['type']}",
+            "content": "Conteúdo markdown completo aqui..."
         }}
         """
+        return system_prompt, user_prompt
+
+    def _complete(self, system_prompt, user_prompt, on_header=None):
+        """
+        Calls the chat API, backing off exponentially (with jitter) on 429s.
+        With `on_header` the completion is streamed (see _stream_completion).
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        for attempt in range(self.max_retries + 1):
+            try:
+                if on_header:
+                    return self._stream_completion(messages, on_header)
+
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature
+                )
+                self._record_usage(response.usage)
+                return response.choices[0].message.content.strip()
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"   ⏳ Rate limit da OpenAI (429). Nova tentativa em {delay:.1f}s...")
+                time.sleep(delay)
 
+    def _stream_completion(self, messages, on_header):
+        """
+        Streams the completion and calls on_header({title, slug, tags}) as soon as
+        those fields are complete. If on_header returns False the stream is closed
+        (no more tokens are paid for) and None is returned.
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            stream=True,
+            # The last chunk then carries the token usage (for the traces)
+            stream_options={"include_usage": True}
+        )
+        extractor = _HeaderExtractor()
+        header_sent = False
+        parts = []
+        try:
+            for chunk in stream:
+                if chunk.usage:
+                    self._record_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                if not header_sent:
+                    header = extractor.feed(delta)
+                    if header:
+                        header_sent = True
+                        if on_header(header) is False:
+                            return None
+        finally:
+            stream.close()
+        return "".join(parts).strip()
+
+    def _record_usage(self, usage):
+        """Adds the call's tokens and estimated cost to the current trace span."""
+        if not usage:
+            return
+        price_in, price_out = PRICING_PER_MTOKEN.get(self.model, (0, 0))
+        tracing.current().add(
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cost_usd=(usage.prompt_tokens * price_in + usage.completion_tokens * price_out) / 1_000_000
+        )
+
+    def _retry_delay(self, error, attempt):
+        # Honour Retry-After when the API sends it, otherwise 2s, 4s, 8s... (max 60s)
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7
-            )
-
-            content_raw = response.choices[0].message.content.strip()
-            
-            # Remove code blocks if the potential "vibes" of the model added them despite instructions
-            if content_raw.startswith("```json"):
-                content_raw = content_raw.replace("```json", "").replace("```", "")
-            
-            article_data = json_repair.loads(content_raw)
-            return article_data
-
-        except Exception as e:
-            print(f"❌ Erro ao gerar artigo com IA: {e}")
-            return None
+            return float(retry_after) + random.uniform(0, 1)
+        except (TypeError, ValueError):
+            return min(60, 2 ** (attempt + 1)) + random.uniform(0, 1)
+
+    def _parse(self, content_raw):
+        return parse_completion(content_raw)
+
+    def generate_article(self, scraped_item, on_header=None):
+        """
+        Generates a full blog post based on the scraped item.
+
+        on_header(scraped_item, header) is called with title/slug/tags as soon as
+        they are known (mid-stream); returning False cancels the generation.
+        """
+        with span("writer.generate", model=self.model, source=scraped_item.get("source")) as current_span:
+            print(f"🤖 Gerando artigo para: '{scraped_item['title']}'...")
+
+            header_hook = None
+            if on_header:
+                answers = []
+
+                def header_hook(header):
+                    # A stream retried after a 429 sends the header again: the caller hears it once
+                    if not answers:
+                        answers.append(on_header(scraped_item, header))
+                    return answers[0]
+
+            try:
+                system_prompt, user_prompt = self._build_prompts(scraped_item)
+                cache_key = LLMCache.key(self.model, system_prompt, user_prompt, self.temperature)
+                if not self.bypass_cache:
+                    cached = self.cache.get(cache_key)
+                    if cached:
+                        print("   ♻️ Resposta reaproveitada do cache local (sem custo de API).")
+                        current_span.set(cached=True)
+                        article_data = cached[1]
+                        if header_hook and header_hook(article_data) is False:
+                            return None
+                        return article_data
+
+                content_raw = self._complete(system_prompt, user_prompt, header_hook)
+                if content_raw is None:
+                    print("   ⏹️ Geração interrompida após o cabeçalho.")
+                    current_span.set(cancelled=True)
+                    return None
+                article_data = self._parse(content_raw)
+                if isinstance(article_data, dict) and article_data:
+                    self.cache.put(cache_key, self.model, content_raw, article_data)
+                return article_data
+
+            except Exception as e:
+                print(f"❌ Erro ao gerar artigo com IA: {e}")
+                current_span.fail(e)
+                return None
+
+    def generate_articles(self, scraped_items, max_workers=None, on_header=None):
+        """
+        Batch mode: generates several articles concurrently (at most `max_workers`
+        OpenAI calls in flight) and yields (scraped_item, article_data) as each
+        one completes. article_data is None when that item failed.
+        """
+        scraped_items = list(scraped_items)
+        if not scraped_items:
+            return
+
+        workers = min(max_workers or self.max_workers, len(scraped_items))
+        print(f"🤖 Gerando {len(scraped_items)} artigos em lote ({workers} em paralelo)...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # wrap(): the worker threads' spans nest under the caller's
+            futures = {executor.submit(tracing.wrap(self.generate_article), item, on_header): item
+                       for item in scraped_items}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
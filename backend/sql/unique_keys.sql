@@ -0,0 +1,10 @@
+-- Unique keys the backend upserts on (modules/persistence.py CONFLICT_COLUMNS).
+-- Without them BulkWriter refuses to write (MissingUniqueIndex).
+-- Run once in the Supabase SQL editor. If a statement fails, the table already
+-- holds duplicates: find them with the query below and remove the extra rows first.
+--
+--   select slug, count(*) from posts group by slug having count(*) > 1;
+
+create unique index if not exists posts_slug_key on posts (slug);
+create unique index if not exists jobs_apply_url_key on jobs (apply_url);
+create unique index if not exists videos_url_key on videos (url);
@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+
+# Add current directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import storage
+from modules.clustering import StoryClusterer
+
+# The same story as reported by different sources (titles/summaries as they appear in the feeds)
+SAME_STORY = [
+    (
+        {"title": "OpenAI launches GPT-5, its smartest model yet", "source": "The Verge",
+         "summary": "OpenAI today released GPT-5, a new flagship model that it says is faster and better at "
+                    "coding and reasoning. It is rolling out to all ChatGPT users, including the free tier."},
+        {"title": "GPT-5 is here: OpenAI's new flagship model rolls out to ChatGPT users", "source": "TechCrunch",
+         "summary": "The new model replaces GPT-4o as the default in ChatGPT, with improvements to coding, "
+                    "reasoning and fewer hallucinations, the company said on Thursday."},
+    ),
+    (
+        {"title": "Vite 6.0 is out!", "source": "Vite Blog",
+         "summary": "Today, we're taking another big step in Vite's story. Vite 6 introduces the experimental "
+                    "Environment API, supports Node.js 18, 20 and 22+, and updates Sass and PostCSS defaults."},
+        {"title": "Vite 6 released with experimental Environment API", "source": "DEV Community",
+         "summary": "The Vite team has shipped version 6 of the frontend build tool. The headline feature is the "
+                    "experimental Environment API, aimed at framework authors."},
+    ),
+    (
+        {"title": "Node.js 22 enters Long Term Support", "source": "InfoQ",
+         "summary": "Node.js 22 is now LTS under the codename 'Jod', recommended for production use until April 2027."},
+        {"title": "Node.js v22.11.0 (LTS)", "source": "Node.js Blog",
+         "summary": "Notable changes: this release marks the transition of Node.js 22.x into Long Term Support "
+                    "(LTS) with the codename 'Jod'."},
+    ),
+]
+
+# Different stories on the same topic: must stay separate candidates
+DIFFERENT_STORIES = [
+    (
+        {"title": "OpenAI launches GPT-5, its smartest model yet",
+         "summary": "OpenAI today released GPT-5, a new flagship model that it says is faster and better at coding."},
+        {"title": "OpenAI cuts GPT-4o API prices by half",
+         "summary": "Developers using GPT-4o through the API will pay 50% less for input tokens starting today."},
+    ),
+    (
+        {"title": "Nuxt 3.15 released with Vite 6 support",
+         "summary": "The latest Nuxt minor brings Vite 6, improved hot module replacement and performance work."},
+        {"title": "Nuxt 4 roadmap: what's coming next",
+         "summary": "A look at the plans for Nuxt 4: new directory structure, data fetching changes and the migration path."},
+    ),
+    (
+        {"title": "Build an AI agent with n8n and OpenAI",
+         "summary": "Step by step tutorial: connect the OpenAI node to a Telegram trigger and build a support agent in n8n."},
+        {"title": "n8n raises $60M to build AI workflow automation",
+         "summary": "The Berlin-based workflow automation startup n8n has raised $60 million in a Series B round."},
+    ),
+    # Releases and aggregator entries sharing only a generic verb, a version or a name
+    ({"title": "Python 3.13 released"}, {"title": "Django 5.1 released"}),
+    ({"title": "Vue 3.5 released"}, {"title": "Nuxt 3.5 released"}),
+    (
+        {"title": "Show HN: Cursor", "summary": '<a href="https://news.ycombinator.com/item?id=2">Comments</a>'},
+        {"title": "Cursor raises $900M",
+         "summary": "Anysphere, the startup behind the AI code editor Cursor, has raised $900 million at a $9.9 billion valuation."},
+    ),
+    (
+        {"title": "Claude", "summary": '<a href="https://news.ycombinator.com/item?id=3">Comments</a>'},
+        {"title": "Anthropic releases Claude 4 with extended thinking and tool use",
+         "summary": "Anthropic today released Claude Opus 4 and Sonnet 4, its new models that can use tools during extended thinking."},
+    ),
+]
+
+
+def test_clustering():
+    print("🧩 TESTE DO AGRUPAMENTO DE HISTÓRIAS 🧩")
+    print("-" * 50)
+    storage.CACHE_DIR = tempfile.mkdtemp(prefix="techub-clustering-")
+    clusterer = StoryClusterer()
+
+    for a, b in SAME_STORY:
+        score = clusterer.similarity(clusterer.signature(a), clusterer.signature(b))
+        print(f"   [mesma]     {score:.2f}  {a['title'][:35]} | {b['title'][:35]}")
+        assert len(clusterer.collapse([dict(a, link="https://a"), dict(b, link="https://b")])) == 1
+
+    for a, b in DIFFERENT_STORIES:
+        score = clusterer.similarity(clusterer.signature(a), clusterer.signature(b))
+        print(f"   [distinta]  {score:.2f}  {a['title'][:35]} | {b['title'][:35]}")
+        assert len(clusterer.collapse([dict(a, link="https://a"), dict(b, link="https://b")])) == 2
+
+    # A rewrite of a published story is dropped in later runs
+    published, rewrite = SAME_STORY[0]
+    clusterer.add(dict(published, link="https://published"))
+    assert clusterer.collapse([dict(rewrite, link="https://rewrite")]) == []
+
+    # ...but stories sharing a word or two with a published one are kept
+    for published, other in DIFFERENT_STORIES[3:]:
+        clusterer.add(dict(published, link="https://published"))
+        assert len(clusterer.collapse([dict(other, link="https://other")])) == 1
+    print("\n✅ Reescritas agrupadas e histórias distintas mantidas.")
+
+
+if __name__ == "__main__":
+    test_clustering()
@@ -0,0 +1,90 @@
+import io
+import os
+import sys
+import tempfile
+
+# Add current directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import feedparser
+import requests
+from contextlib import redirect_stdout
+from requests.adapters import BaseAdapter
+from modules import storage
+from modules.feed_cache import ValidatorCache
+from modules.fetcher import FeedFetcher
+from modules.http_client import HttpClient
+from modules.scraper import Scraper
+from modules.work_queue import WorkQueue
+from bench import corpus
+
+
+class _ConditionalFeeds(BaseAdapter):
+    """Serves fixed feed bodies with an ETag and answers 304 when it is sent back."""
+
+    def __init__(self, bodies):
+        super().__init__()
+        self.bodies = bodies
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        etag = f'"{hash(self.bodies[request.url])}"'
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response.raw = io.BytesIO(b"")
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = etag
+            response.raw = io.BytesIO(self.bodies[request.url])
+        self.requests.append((request.url, response.status_code))
+        return response
+
+    def close(self):
+        pass
+
+
+def _run(sources, http, published, queue):
+    """One articles-pipeline scrape: new candidates go to the queue. Returns {feed url: status}."""
+    scraper = Scraper(fetcher=FeedFetcher(http=http, cache=ValidatorCache()))
+    scraper.sources = sources
+    scraper.scheduler.due = lambda due: due
+    start = len(http.adapter.requests)
+    with redirect_stdout(io.StringIO()):
+        articles = scraper.get_latest_news(limit=2, existing_urls=published, queued_urls=queue.keys())
+    queue.enqueue(articles)
+    return dict(http.adapter.requests[start:]), len(articles)
+
+
+def test_feed_validators():
+    print("🏷️ TESTE DO GET CONDICIONAL DOS FEEDS 🏷️")
+    print("-" * 50)
+    # One RSS feed read by the fast parser and one Atom feed through feedparser, 10 entries each
+    sources, bodies = corpus.feeds(2, 10)
+
+    scenarios = {
+        # Newest 2 entries unpublished: both fit in one run, the second run is a 304
+        2: [(200, 4), (304, 0)],
+        # Newest 3 unpublished: the 3rd is left on the first run, so the feed is read again once
+        3: [(200, 4), (200, 2), (304, 0), (304, 0)],
+    }
+    for unpublished, expected in scenarios.items():
+        storage.CACHE_DIR = tempfile.mkdtemp(prefix="techub-validators-")
+        http = HttpClient()
+        http.adapter = _ConditionalFeeds(bodies)
+        queue = WorkQueue()
+        published = [entry.link for body in bodies.values() for entry in feedparser.parse(body).entries[unpublished:]]
+
+        print(f"\n   {unpublished} entradas novas por feed:")
+        for run, (status, found) in enumerate(expected, 1):
+            statuses, articles = _run(sources, http, published, queue)
+            print(f"   Execução {run}: HTTP {sorted(statuses.values())} -> {articles} artigos")
+            assert set(statuses.values()) == {status}, statuses
+            assert articles == found, articles
+
+    print("\n✅ Feeds sem novidades respondem 304 na execução seguinte.")
+
+if __name__ == "__main__":
+    test_feed_validators()